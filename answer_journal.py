@@ -0,0 +1,119 @@
+# answer_journal.py
+# Crash-safe record of the answers given in QuizApp. Each answer is appended to
+# the journal of the PDF being answered, answers-<content hash>.journal (see
+# journal_path), as a JSON line [question_number, letter] by a background
+# writer that batches whatever arrived within FLUSH_INTERVAL seconds (a question
+# answered twice in that window is written once). Nothing is rewritten while
+# answering; answers.txt is produced from the answers on demand or on finish.
+# After a crash, replay() reads the journal back once the same PDF is loaded
+# again; question numbers from one PDF never land on another's questions.
+import json
+import os
+import threading
+
+from atomic_io import write_atomic
+
+ANSWER_JOURNAL = "answers-{}.journal"  # formatted with the PDF's content hash
+FLUSH_INTERVAL = 0.5  # seconds an answer may wait before it is written
+
+
+def journal_path(pdf_hash, directory="."):
+    """The journal of the PDF with this content hash (extract_cache.file_hash)."""
+    return os.path.join(directory, ANSWER_JOURNAL.format(pdf_hash[:16]))
+
+
+class AnswerJournal:
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.error = None         # last write error, retried on the next flush
+        self._pending = {}        # question number -> letter, not yet written
+        self._lock = threading.Lock()     # guards _pending
+        self._io_lock = threading.Lock()  # one writer of the file at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def replay(self):
+        """
+        The answers left by a session that didn't finish ({number: letter}, the
+        last answer to a question wins). A line cut short by a crash is dropped.
+        The journal is rewritten to just these answers so it doesn't keep growing.
+        """
+        # under the writer's lock: an append between the read and the rewrite would be lost
+        with self._io_lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return {}
+            answers = {}
+            for line in data.splitlines():
+                try:
+                    number, letter = json.loads(line)
+                except ValueError:
+                    continue
+                answers[number] = letter
+            write_atomic(self.path, "".join(json.dumps([n, a]) + "\n" for n, a in answers.items()).encode("utf-8"))
+        return answers
+
+    def record(self, number, letter):
+        """Queues an answer for the writer; returns immediately."""
+        with self._lock:
+            self._pending.pop(number, None)  # keep the file in answering order
+            self._pending[number] = letter
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # debounce: collect what arrives in the next interval (close() cuts it short)
+            self._stop.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Writes the queued answers now, in the calling thread."""
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            data = "".join(json.dumps([n, a]) + "\n" for n, a in batch.items()).encode("utf-8")
+            try:
+                with open(self.path, "a+b") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size:
+                        f.seek(size - 1)
+                        if f.read(1) != b"\n":
+                            data = b"\n" + data  # end a line cut short by a crash, don't continue it
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.error = None
+            except OSError as e:
+                # keep them for the next flush; answers given since win
+                self.error = e
+                with self._lock:
+                    batch.update(self._pending)
+                    self._pending = batch
+
+    def clear(self):
+        """Forgets the journal once the answers are safely exported."""
+        with self._io_lock:
+            with self._lock:
+                self._pending = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self):
+        """Stops the writer after writing whatever is still queued."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -1,10 +1,21 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from extractor import extract_question_blocks
-from PIL import Image, ImageTk
-import csv
-import openpyxl
+from extractor import iter_question_blocks_cached
+from answer_journal import AnswerJournal, journal_path
+from extract_cache import file_hash
+from exporters import ANSWERS_HEADER, answer_rows, export, export_async
+from thumbnail_cache import ThumbnailCache
+from image_bundle import open_image
+from PIL import ImageTk
+import multiprocessing
 import os
+import queue
+import threading
+
+LOAD_WORKERS = os.cpu_count() or 1  # processes used to extract pages
+POLL_MS = 50                        # how often the Tk loop drains the loader queue
+THUMB_SIZE = (400, 300)
+PREFETCH_AHEAD = 3                  # questions either side whose images are decoded in advance
 
 class QuizApp:
     def __init__(self, root):
@@ -18,7 +29,23 @@ class QuizApp:
 
         self.theme_dark = False
 
-        tk.Button(root, text="Load PDF", command=self.load_pdf).pack(pady=10)
+        # background loading: the worker thread only touches self._load_queue,
+        # everything else happens on the Tk thread in _poll_load_queue
+        self._load_queue = queue.Queue()
+        self._load_cancel = None
+        self._load_id = 0
+        self._polling = False
+        self.loading = False
+        self._export = None  # Future of the running finish() export
+        self.thumbnails = ThumbnailCache(loader=open_image)  # bundle refs or plain paths
+
+        load_bar = tk.Frame(root)
+        load_bar.pack(pady=10)
+        tk.Button(load_bar, text="Load PDF", command=self.load_pdf).pack(side="left", padx=5)
+        self.cancel_btn = tk.Button(load_bar, text="Cancel", command=self.cancel_load, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.progress = tk.Label(load_bar, text="")
+        self.progress.pack(side="left", padx=10)
 
         # Theme toggle
         tk.Button(root, text="Toggle Theme", command=self.toggle_theme).pack()
@@ -61,6 +88,13 @@ class QuizApp:
         self.status = tk.Label(root, text="")
         self.status.pack()
 
+        # answers go to the loaded PDF's journal in the background; answers.txt is
+        # written on Ctrl+S and on finish. A session on the same PDF that didn't
+        # finish is picked up again once that PDF has loaded.
+        self.journal = None
+        self.root.bind("<Control-s>", lambda e: self.save_answers())
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
     def toggle_theme(self):
         self.theme_dark = not self.theme_dark
         bg = "#1e1e1e" if self.theme_dark else "#ffffff"
@@ -75,13 +109,99 @@ class QuizApp:
         if not file:
             return
 
-        self.questions = extract_question_blocks(file)
-        if not self.questions:
-            messagebox.showerror("Error", "Could not extract questions.")
-            return
-
+        self.cancel_load()
+        self._close_journal()  # the answers so far belong to the previous PDF
+        self.answers = {}
+        self._load_id += 1
+        self._load_cancel = threading.Event()
+        self.loading = True
+        self.questions = []
         self.index = 0
-        self.show_question()
+        self.cancel_btn.config(state="normal")
+        self.progress.config(text="Loading...")
+
+        threading.Thread(target=self._load_worker, args=(file, self._load_id, self._load_cancel),
+                         daemon=True).start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll_load_queue)
+
+    def _load_worker(self, file, load_id, cancel):
+        # runs off the Tk thread; results are handed over through the queue
+        put = self._load_queue.put
+        try:
+            put((load_id, "journal", file_hash(file)))  # which PDF the answers belong to
+            on_page = lambda i, n: put((load_id, "page", (i, n)))
+            for q in iter_question_blocks_cached(file, workers=LOAD_WORKERS, on_page=on_page):
+                if cancel.is_set():
+                    break
+                put((load_id, "question", q))
+        except Exception as e:
+            put((load_id, "error", str(e)))
+        else:
+            put((load_id, "done", cancel.is_set()))
+
+    def _poll_load_queue(self):
+        finished = False
+        while True:
+            try:
+                load_id, kind, payload = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if load_id != self._load_id:
+                continue  # left over from a cancelled load
+            if kind == "journal":
+                self.journal = AnswerJournal(journal_path(payload))
+            elif kind == "question":
+                self.questions.append(payload)
+                if len(self.questions) == 1:
+                    self.show_question()
+            elif kind == "page":
+                page, pages = payload
+                self.progress.config(text=f"Page {page}/{pages} - {len(self.questions)} questions")
+            elif kind == "error":
+                finished = True
+                messagebox.showerror("Error", f"Could not extract questions: {payload}")
+            elif kind == "done":
+                finished = True
+                cancelled = payload
+                restored = self._restore_answers()
+                if cancelled:
+                    self.progress.config(text=f"Cancelled - {len(self.questions)} questions{restored}")
+                else:
+                    self.progress.config(text=f"{len(self.questions)} questions{restored}")
+                if not self.questions and not cancelled:
+                    messagebox.showerror("Error", "Could not extract questions.")
+
+        if finished:
+            self._polling = False
+            self.loading = False
+            self.cancel_btn.config(state="disabled")
+        else:
+            self.root.after(POLL_MS, self._poll_load_queue)
+        if self.questions:
+            self._update_status()
+
+    def _restore_answers(self):
+        # answers left in this PDF's journal by a session that didn't finish
+        if self.journal is None:
+            return ""
+        answers = self.journal.replay()
+        if not answers:
+            return ""
+        restored = len(answers)
+        answers.update(self.answers)  # answered while loading: newer
+        self.answers = answers
+        return f", restored {restored} answers from the last session"
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def cancel_load(self):
+        if self._load_cancel is not None:
+            self._load_cancel.set()
 
     def show_question(self):
         q = self.questions[self.index]
@@ -94,13 +214,9 @@ class QuizApp:
         # grid layout 2×2
         images = []
         for img_path in q["images"]:
-            try:
-                im = Image.open(img_path)
-                im.thumbnail((400, 300))
-                tkim = ImageTk.PhotoImage(im)
-                images.append(tkim)
-            except:
-                pass
+            im = self.thumbnails.get(img_path, THUMB_SIZE)
+            if im is not None:
+                images.append(ImageTk.PhotoImage(im))
 
         self._imgs = images  # keep reference
 
@@ -109,11 +225,27 @@ class QuizApp:
             c = i % 2
             tk.Label(self.img_frame, image=im).grid(row=r, column=c, padx=10, pady=10)
 
-        self.status.config(text=f"{self.index+1}/{len(self.questions)}")
+        self._update_status()
+        self._prefetch_images()
+
+    def _prefetch_images(self):
+        # next questions first (the usual direction), then the previous ones
+        ahead = range(self.index + 1, min(self.index + 1 + PREFETCH_AHEAD, len(self.questions)))
+        behind = range(self.index - 1, max(self.index - 1 - PREFETCH_AHEAD, -1), -1)
+        refs = [ref for i in (*ahead, *behind) for ref in self.questions[i]["images"]]
+        self.thumbnails.prefetch(refs, THUMB_SIZE)
+
+    def _update_status(self):
+        more = "+" if self.loading else ""
+        self.status.config(text=f"{self.index+1}/{len(self.questions)}{more}")
 
     def record_answer(self, letter):
-        self.answers[self.questions[self.index]["number"]] = letter
-        self.auto_save()
+        if not self.questions:
+            return
+        number = self.questions[self.index]["number"]
+        self.answers[number] = letter
+        if self.journal is not None:
+            self.journal.record(number, letter)
         self.next_q()
 
     def next_q(self):
@@ -126,38 +258,45 @@ class QuizApp:
             self.index -= 1
             self.show_question()
 
-    def auto_save(self):
-        with open("answers.txt", "w") as f:
-            for q, ans in sorted(self.answers.items()):
-                f.write(f"{q}-{ans}\n")
+    def save_answers(self):
+        if self.answers:
+            export(ANSWERS_HEADER, answer_rows(self.answers), "answers", formats=("txt",))
+            self.status.config(text=f"Saved {len(self.answers)} answers to answers.txt")
+
+    def close(self):
+        self.cancel_load()
+        self._close_journal()
+        self.root.destroy()
 
     def finish(self):
         if not self.answers:
             return
-
-        # Save txt
-        with open("answers.txt", "w") as f:
-            for q, ans in sorted(self.answers.items()):
-                f.write(f"{q}-{ans}\n")
-
-        # Save CSV
-        with open("answers.csv", "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow(["Question", "Answer"])
-            for q, ans in sorted(self.answers.items()):
-                w.writerow([q, ans])
-
-        # Save Excel
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.append(["Question", "Answer"])
-        for q, ans in sorted(self.answers.items()):
-            ws.append([q, ans])
-        wb.save("answers.xlsx")
-
+        if self._export is not None:
+            return  # still saving
+
+        # txt, csv and xlsx are written in parallel off the Tk thread, from a
+        # snapshot of the answers (answering can go on meanwhile)
+        answers = dict(self.answers)
+        self._export = export_async(ANSWERS_HEADER, answer_rows(answers), "answers")
+        self.status.config(text="Saving answers...")
+        self.root.after(POLL_MS, self._poll_export, answers, self.journal)
+
+    def _poll_export(self, answers, journal):
+        if not self._export.done():
+            self.root.after(POLL_MS, self._poll_export, answers, journal)
+            return
+        error = self._export.exception()
+        self._export = None
+        if error is not None:
+            messagebox.showerror("Error", f"Could not save answers: {error}")
+            return
+        if journal is not None and journal is self.journal and self.answers == answers:
+            journal.clear()  # exported: nothing to recover
+        self.status.config(text=f"Saved {len(answers)} answers")
         messagebox.showinfo("Done", "Saved answers in txt, csv, xlsx")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # extraction workers in the frozen exe
     root = tk.Tk()
     QuizApp(root)
     root.mainloop()
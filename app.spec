@@ -5,7 +5,7 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[('extractor.py', '.'), ('images', 'images')],
+    datas=[('extractor.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,137 @@
+# atomic_io.py
+# File primitives for stores shared between processes (the GUI, batch jobs,
+# extraction workers):
+#   locked(path)          advisory exclusive lock on "<path>.lock" (flock / msvcrt)
+#   write_atomic(path, b) write to a temp file, fsync, os.replace over path
+#   read_json(path)       json.load that raises CorruptFileError instead of guessing
+# Readers never see a half-written file; writers that read-modify-write under
+# locked() never lose each other's changes.
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+REPLACE_RETRIES = 50  # Windows refuses os.replace while a reader has the file open
+REPLACE_RETRY_DELAY = 0.02
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # gives up after ~10s: keep waiting
+                return
+            except OSError:
+                continue
+
+    def _unlock(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class CorruptFileError(ValueError):
+    """A store file exists but can't be parsed; it is left as it is for inspection."""
+
+    def __init__(self, path, error):
+        super().__init__(f"{path} is corrupt ({error}); not overwriting it")
+        self.path = path
+
+
+class _PathLock:
+    # one per lock file in this process: the thread lock makes locked() re-entrant
+    # (file locks taken twice by one process would deadlock or merge)
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+@contextmanager
+def locked(path):
+    """
+    Holds an exclusive advisory lock for path (on path + ".lock") across
+    processes and threads. Nested use in one thread is fine.
+    """
+    key = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = _PathLock(key + ".lock")
+    with lock.rlock:
+        if lock.depth == 0:
+            fd = os.open(lock.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _lock(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+            lock.fd = fd
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                fd, lock.fd = lock.fd, None
+                try:
+                    _unlock(fd)
+                finally:
+                    os.close(fd)
+
+
+def replace_file(src, dst):
+    """os.replace, retried while Windows reports the target as in use."""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+
+def write_atomic(path, data: bytes):
+    """Replaces path with data: other processes see the old file or the new one, never a mix."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def dump_json(path, data, indent=2):
+    write_atomic(path, json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8"))
+
+
+def read_json(path, default=None):
+    """The parsed file, default if it doesn't exist; CorruptFileError if it can't be parsed."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except ValueError as e:
+        raise CorruptFileError(path, e) from e
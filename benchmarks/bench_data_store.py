@@ -0,0 +1,65 @@
+# benchmarks/bench_data_store.py
+# Cost of editing a quiz bank through data_store: the JSON backend rewrites the
+# whole file per save, SQLite touches only the quiz (or question) being saved.
+#   python benchmarks/bench_data_store.py [n_quizzes] [questions_per_quiz]
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import JsonQuizStore
+from sqlite_store import SqliteQuizStore
+
+EDITS = 50
+
+
+def make_quiz(n_questions):
+    return {
+        "id": str(uuid.uuid4()),
+        "title": "paper.pdf",
+        "source": "C:/papers/paper.pdf",
+        "questions": [{"id": str(uuid.uuid4()), "number": i + 1, "text": "A block of mass m moves " * 8,
+                       "options": ["1 J", "2 J", "3 J", "4 J"], "correctIndex": i % 4,
+                       "raw": "raw block text " * 20} for i in range(n_questions)],
+    }
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - t0) / repeat
+
+
+def run(store, quizzes):
+    fill = timed(lambda i: store.save_quiz(quizzes[i]), len(quizzes))
+    target = quizzes[len(quizzes) // 2]
+    save = timed(lambda i: store.save_quiz(target), EDITS)
+    question = dict(target["questions"][0])
+    update = timed(lambda i: store.update_question(target["id"], dict(question, text=f"edit {i}")), EDITS)
+    page = timed(lambda i: store.list_quizzes(0, 20), EDITS)
+    get = timed(lambda i: store.get_quiz(quizzes[i % len(quizzes)]["id"]), EDITS)
+    return fill, save, update, page, get
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per = int(sys.argv[2]) if len(sys.argv) > 2 else 75
+    quizzes = [make_quiz(per) for _ in range(n)]
+    print(f"{n} quizzes x {per} questions, ms per call")
+    print(f"{'backend':<8} {'fill (avg)':>11} {'save_quiz':>10} {'update_q':>10} {'list 20':>10} {'get_quiz':>10}")
+    with tempfile.TemporaryDirectory() as d:
+        for name, store in (("json", JsonQuizStore(os.path.join(d, "quizzes.json"))),
+                            ("sqlite", SqliteQuizStore(os.path.join(d, "quizzes.db")))):
+            fill, save, update, page, get = run(store, quizzes)
+            print(f"{name:<8} {fill * 1e3:>11.2f} {save * 1e3:>10.2f} {update * 1e3:>10.2f} {page * 1e3:>10.2f} "
+                  f"{get * 1e3:>10.2f}")
+            if hasattr(store, "close"):
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_image_store.py
+# Storing and reading back figure crops: one PNG file per crop against one
+# image bundle per PDF. Run it on the drive the app uses (e.g. a network share):
+# per-file costs are what the bundle saves.
+#   python benchmarks/bench_image_store.py [crops] [store_dir]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+import image_bundle
+import image_store
+
+
+def make_crop(i):
+    im = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(im)
+    rng = random.Random(i)
+    for _ in range(20):
+        x, y = rng.randrange(400), rng.randrange(300)
+        draw.line((x, y, rng.randrange(400), rng.randrange(300)), fill="black", width=2)
+    return im
+
+
+def timed(fn, items):
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - t0) / len(items)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    crops = [make_crop(i) for i in range(n)]
+    with tempfile.TemporaryDirectory(dir=sys.argv[2] if len(sys.argv) > 2 else None) as d:
+        loose_dir = os.path.join(d, "loose")
+        os.makedirs(loose_dir)
+        source = os.path.join(d, "paper.pdf")
+        print(f"{n} crops, ms per crop")
+        print(f"{'store':<8} {'write':>8} {'read':>8} {'files':>6}")
+        for name, store in (("loose", lambda im: image_store.store_image(im, loose_dir)),
+                            ("bundle", lambda im: image_store.store_image(im, os.path.join(d, "bundles"), source))):
+            refs = []
+            write = timed(lambda im: refs.append(store(im)), crops)
+            read = timed(lambda ref: image_bundle.open_image(ref).load(), random.sample(refs, len(refs)))
+            files = len(os.listdir(loose_dir if name == "loose" else os.path.join(d, "bundles")))
+            print(f"{name:<8} {write * 1e3:>8.2f} {read * 1e3:>8.2f} {files:>6}")
+        image_bundle.close_bundle(image_bundle.bundle_path(os.path.join(d, "bundles"), source))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_line_grouping.py
+# Benchmark: dict/round(top) line grouping (old group_chars_to_lines / group_lines)
+# vs the NumPy implementation in line_grouping.
+#   python benchmarks/bench_line_grouping.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from line_grouping import group_chars
+
+
+def group_chars_dict(chars):
+    # the previous implementation, kept here as the baseline
+    lines_map = {}
+    for ch in chars:
+        lines_map.setdefault(int(round(ch["top"])), []).append(ch)
+    lines = []
+    for k in sorted(lines_map.keys()):
+        row = sorted(lines_map[k], key=lambda c: c["x0"])
+        text = "".join(c.get("text", "") for c in row)
+        x0 = min(c["x0"] for c in row)
+        x1 = max(c["x1"] for c in row)
+        top = min(c["top"] for c in row)
+        bottom = max(c["bottom"] for c in row)
+        lines.append({"text": text, "chars": row, "bbox": (x0, top, x1, bottom)})
+    return lines
+
+
+def make_chars(n_chars, seed=0):
+    """Dense page: 11pt lines every 12pt, 6pt wide glyphs, shuffled like pdfplumber's stream order."""
+    rnd = random.Random(seed)
+    per_line = 90
+    chars = []
+    for i in range(n_chars):
+        line, col = divmod(i, per_line)
+        top = 20 + line * 12 + rnd.choice((0.0, 0.0, 0.2))  # small baseline jitter
+        x0 = 30 + col * 6
+        chars.append({"text": chr(97 + i % 26), "x0": x0, "x1": x0 + 5.5, "top": top, "bottom": top + 11})
+    rnd.shuffle(chars)
+    return chars
+
+
+def main():
+    print(f"{'chars':>7} {'dict ms':>9} {'numpy ms':>9} {'speedup':>8}")
+    for n in (1000, 5000, 20000, 50000):
+        chars = make_chars(n)
+        old, new = group_chars_dict(chars), group_chars(chars)
+        assert [l["text"] for l in old] == [l["text"] for l in new]
+        number = max(1, 100000 // n)
+        t_old = timeit.timeit(lambda: group_chars_dict(chars), number=number) / number
+        t_new = timeit.timeit(lambda: group_chars(chars), number=number) / number
+        print(f"{n:>7} {t_old * 1000:>9.2f} {t_new * 1000:>9.2f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_results.py
+# Cost of save_result with a long history: rewriting results.json per result
+# against appending to the results journal, plus reading the per-quiz aggregates.
+#   python benchmarks/bench_results.py [history] [quizzes]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_journal import ResultsJournal
+
+SAVES = 200
+
+
+def make_result(i, n_quizzes):
+    q = random.randrange(n_quizzes)
+    return {"quiz_id": f"quiz-{q}", "quiz_title": f"paper {q}.pdf", "score": random.randint(0, 75),
+            "total": 75, "timestamp": float(i)}
+
+
+def rewrite_save(path, record):
+    # the old save_result: read everything, append, write everything
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    results.append(record)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_quizzes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    random.seed(0)
+    history = [make_result(i, n_quizzes) for i in range(n)]
+    new = [make_result(n + i, n_quizzes) for i in range(SAVES)]
+    print(f"{n} results in history, {n_quizzes} quizzes, ms per call")
+    with tempfile.TemporaryDirectory() as d:
+        old = os.path.join(d, "old.json")
+        with open(old, "w", encoding="utf-8") as f:
+            json.dump(history, f)
+        print(f"{'rewrite save':<22} {timed(lambda i: rewrite_save(old, new[i]), SAVES) * 1e3:>8.2f}")
+
+        snapshot = os.path.join(d, "results.json")
+        with open(snapshot, "w", encoding="utf-8") as f:
+            json.dump(history, f)
+        journal = ResultsJournal(snapshot)
+        t0 = time.perf_counter()
+        journal.stats()
+        print(f"{'stats, first call':<22} {(time.perf_counter() - t0) * 1e3:>8.2f}  (builds {os.path.basename(journal.stats_path)})")
+        journal.compact()
+        print(f"{'journal save':<22} {timed(lambda i: journal.append(new[i]), SAVES) * 1e3:>8.2f}")
+        print(f"{'save + stats(quiz)':<22} "
+              f"{timed(lambda i: (journal.append(new[i]), journal.stats(new[i]['quiz_id'])), SAVES) * 1e3:>8.2f}")
+        print(f"{'stats, new process':<22} {timed(lambda i: ResultsJournal(snapshot).stats(), 5) * 1e3:>8.2f}")
+        t0 = time.perf_counter()
+        journal.compact()
+        print(f"{'compact':<22} {(time.perf_counter() - t0) * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
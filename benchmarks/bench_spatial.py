@@ -0,0 +1,47 @@
+# benchmarks/bench_spatial.py
+# Micro-benchmark: nested-loop image assignment vs spatial.assign_images.
+#   python benchmarks/bench_spatial.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial import assign_images
+
+
+def intersects(a, b):
+    return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
+
+
+def nested_loop(block_bboxes, image_bboxes):
+    # what the extractors did before: every block against every image
+    return [[i for i, ib in enumerate(image_bboxes) if intersects(bb, ib)] for bb in block_bboxes]
+
+
+def make_page(n_blocks, n_images, seed=0):
+    """A4-sized page: question blocks stacked down the page, small images scattered over it."""
+    rnd = random.Random(seed)
+    h = 792 / n_blocks
+    blocks = [(40, i * h, 570, (i + 1) * h - 2) for i in range(n_blocks)]
+    images = []
+    for _ in range(n_images):
+        x, y = rnd.uniform(40, 540), rnd.uniform(0, 770)
+        images.append((x, y, x + rnd.uniform(2, 30), y + rnd.uniform(2, 20)))
+    return blocks, images
+
+
+def main():
+    print(f"{'blocks':>6} {'images':>6} {'nested ms':>10} {'sweep ms':>9} {'speedup':>8}")
+    for n_blocks, n_images in [(5, 10), (10, 100), (20, 500), (30, 2000), (40, 5000)]:
+        blocks, images = make_page(n_blocks, n_images)
+        assert nested_loop(blocks, images) == assign_images(blocks, images)
+        number = max(1, 2000 // n_images)
+        t_nested = timeit.timeit(lambda: nested_loop(blocks, images), number=number) / number
+        t_sweep = timeit.timeit(lambda: assign_images(blocks, images), number=number) / number
+        print(f"{n_blocks:>6} {n_images:>6} {t_nested * 1000:>10.3f} {t_sweep * 1000:>9.3f} {t_nested / t_sweep:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/make_corpus.py
+# Generates synthetic JEE-style question papers with reportlab, each with a
+# ground-truth JSON next to it (<name>.pdf + <name>.json).
+#   python benchmarks/make_corpus.py --out benchmarks/corpus --pages 10 100 1000
+import argparse
+import json
+import os
+import random
+
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+FONT_SIZE = 10
+LINE_H = 14
+MARGIN = 40
+COL_GAP = 20
+FIG_W, FIG_H = 120, 80
+
+SUBJECTS = ["a block", "a small stone", "an ideal gas", "a charged particle", "a uniform rod",
+            "a convex lens", "a solenoid", "a satellite", "a simple pendulum", "a capacitor"]
+VERBS = ["moves along the x-axis", "is released from rest", "is heated at constant pressure",
+         "enters a uniform magnetic field", "is pivoted at one end", "forms a real image",
+         "carries a steady current", "orbits the earth", "oscillates with small amplitude",
+         "is charged through a resistor"]
+ASKS = ["Find its speed after 2 s.", "What is the work done?", "Find the time period.",
+        "Which of the following is correct?", "Find the ratio of the two quantities.",
+        "What is the magnitude of the force?", "Find the final temperature."]
+UNITS = ["m/s", "J", "s", "N", "K", "W", "A", "V"]
+OPTION_LAYOUTS = ["inline", "grid", "stacked"]
+
+
+def _stem(rnd):
+    words = (f"{rnd.choice(SUBJECTS).capitalize()} of mass {rnd.randint(1, 9)} kg "
+             f"{rnd.choice(VERBS)} as shown. {rnd.choice(ASKS)}").split()
+    # a few filler clauses so stems wrap over 1-4 lines
+    for _ in range(rnd.randint(0, 3)):
+        words += f"Take g = 10 m/s2 and neglect air resistance in case {rnd.randint(1, 99)}.".split()
+    return " ".join(words)
+
+
+def _wrap(text, width, font=FONT, size=FONT_SIZE):
+    lines, cur = [], ""
+    for w in text.split():
+        cand = f"{cur} {w}".strip()
+        if cur and stringWidth(cand, font, size) > width:
+            lines.append(cur)
+            cur = w
+        else:
+            cur = cand
+    if cur:
+        lines.append(cur)
+    return lines
+
+
+def _figure(rnd):
+    im = Image.new("RGB", (FIG_W * 2, FIG_H * 2), "white")
+    d = ImageDraw.Draw(im)
+    for _ in range(4):
+        x0, y0 = rnd.randint(0, FIG_W), rnd.randint(0, FIG_H)
+        d.rectangle((x0, y0, x0 + rnd.randint(10, FIG_W), y0 + rnd.randint(10, FIG_H)), outline="black", width=3)
+    d.line((0, FIG_H * 2 - 10, FIG_W * 2, FIG_H * 2 - 10), fill="black", width=3)
+    return ImageReader(im)
+
+
+def _option_lines(options, layout):
+    opts = [f"({i + 1}) {o}" for i, o in enumerate(options)]
+    if layout == "inline":
+        return ["   ".join(opts)]
+    if layout == "grid":
+        return ["   ".join(opts[:2]), "   ".join(opts[2:])]
+    return opts
+
+
+def make_paper(path, pages, columns=1, figure_density=0.2, option_layout="mixed", answer_key=True, seed=0):
+    """
+    Writes a paper of `pages` question pages (plus an answer-key page when
+    answer_key) and returns its ground truth:
+      { "pages": int, "columns": int, "questions": [ {number, page, stem, options, answer, figure, layout} ] }
+    answer is the 0-based index of the correct option.
+    """
+    rnd = random.Random(seed)
+    page_w, page_h = A4
+    col_w = (page_w - 2 * MARGIN - (columns - 1) * COL_GAP) / columns
+    c = canvas.Canvas(path, pagesize=A4)
+    truth = []
+    number = 1
+
+    for page_no in range(1, pages + 1):
+        for col in range(columns):
+            x = MARGIN + col * (col_w + COL_GAP)
+            y = page_h - MARGIN
+            while True:
+                stem = _stem(rnd)
+                options = [f"{rnd.randint(1, 50) / 2} {rnd.choice(UNITS)}" for _ in range(4)]
+                layout = rnd.choice(OPTION_LAYOUTS) if option_layout == "mixed" else option_layout
+                figure = rnd.random() < figure_density
+                num_label = f"{number}."
+                # gap wider than pdfplumber's x_tolerance so "1." and the stem stay separate words
+                indent = c.stringWidth(num_label, BOLD_FONT, FONT_SIZE) + 5
+                stem_lines = _wrap(stem, col_w - indent)
+                opt_lines = _option_lines(options, layout)
+                height = (len(stem_lines) + len(opt_lines)) * LINE_H + (FIG_H + 6 if figure else 0) + LINE_H
+                if y - height < MARGIN:
+                    break
+
+                y -= LINE_H
+                c.setFont(BOLD_FONT, FONT_SIZE)
+                c.drawString(x, y, num_label)
+                c.setFont(FONT, FONT_SIZE)
+                for i, ln in enumerate(stem_lines):
+                    if i:
+                        y -= LINE_H
+                    c.drawString(x + indent, y, ln)
+                if figure:
+                    y -= FIG_H + 6
+                    c.drawImage(_figure(rnd), x + indent, y, width=FIG_W, height=FIG_H)
+                for ln in opt_lines:
+                    y -= LINE_H
+                    c.drawString(x + indent, y, ln)
+                y -= LINE_H  # gap between questions
+
+                truth.append({"number": number, "page": page_no, "stem": stem, "options": options,
+                              "answer": rnd.randrange(4), "figure": figure, "layout": layout})
+                number += 1
+        c.showPage()
+
+    if answer_key:
+        # compact "1. (3) 2. (1) ..." table, ten answers per row
+        y = page_h - MARGIN
+        c.setFont(BOLD_FONT, FONT_SIZE + 2)
+        c.drawString(MARGIN, y, "ANSWER KEY")
+        c.setFont(FONT, FONT_SIZE)
+        for i in range(0, len(truth), 10):
+            y -= LINE_H
+            if y < MARGIN:
+                c.showPage()
+                c.setFont(FONT, FONT_SIZE)
+                y = page_h - MARGIN
+            c.drawString(MARGIN, y, " ".join(f"{q['number']}. ({q['answer'] + 1})" for q in truth[i:i + 10]))
+        c.showPage()
+
+    c.save()
+    return {"pages": pages, "columns": columns, "figure_density": figure_density,
+            "option_layout": option_layout, "answer_key": answer_key, "questions": truth}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic question-paper corpus.")
+    ap.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus"))
+    ap.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--columns", type=int, nargs="+", default=[1, 2])
+    ap.add_argument("--figure-density", type=float, nargs="+", default=[0.2])
+    ap.add_argument("--option-layout", choices=OPTION_LAYOUTS + ["mixed"], default="mixed")
+    ap.add_argument("--no-answer-key", action="store_true")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for pages in args.pages:
+        for columns in args.columns:
+            for density in args.figure_density:
+                name = f"paper_p{pages}_c{columns}_f{int(density * 100)}"
+                pdf_path = os.path.join(args.out, name + ".pdf")
+                truth = make_paper(pdf_path, pages, columns, density, args.option_layout,
+                                   not args.no_answer_key, args.seed)
+                with open(os.path.join(args.out, name + ".json"), "w", encoding="utf-8") as f:
+                    json.dump(truth, f, indent=1)
+                print(f"{pdf_path}: {len(truth['questions'])} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# benchmarks/run_benchmarks.py
+# Runs every extractor over a synthetic corpus (see make_corpus.py) and reports
+# pages/sec, questions/sec, peak RSS and parse accuracy against the ground truth.
+#   python benchmarks/make_corpus.py --pages 10 100
+#   python benchmarks/run_benchmarks.py benchmarks/corpus
+#
+# Each (paper, extractor) run happens in a fresh subprocess so peak RSS is per run.
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTRACTORS = ["extractor", "pdf_processor", "quiz_extractor", "run_extract_and_answer", "parser"]
+
+LEADING_NUM_RE = re.compile(r'^\s*Q?\s*(\d+)\s*[\.\)]')
+
+
+def _leading_number(text):
+    m = LEADING_NUM_RE.match(text or "")
+    return int(m.group(1)) if m else None
+
+
+def _run_extractor(name, pdf_path):
+    """Returns a list of {"number", "options"} (options None when the extractor doesn't split them)."""
+    if name == "extractor":
+        from extractor import extract_question_blocks
+        return [{"number": q["number"], "options": None}
+                for q in extract_question_blocks(pdf_path, temp_dir="images")]
+    if name == "pdf_processor":
+        from pdf_processor import extract_questions_with_images
+        return [{"number": _leading_number(q["question"]), "options": q["options"]}
+                for q in extract_questions_with_images(pdf_path)]
+    if name == "quiz_extractor":
+        from quiz_extractor import extract_questions
+        return [{"number": q["number"], "options": None} for q in extract_questions(pdf_path)]
+    if name == "run_extract_and_answer":
+        from run_extract_and_answer import find_question_blocks
+        return [{"number": q["qnum"], "options": None} for q in find_question_blocks(pdf_path)]
+    if name == "parser":
+        import pdfplumber
+        from parser import parse_pages
+        with pdfplumber.open(pdf_path) as pdf:
+            return [{"number": q["number"], "options": q["options"], "answer": q["correctIndex"]}
+                    for q in parse_pages(p.extract_text() or "" for p in pdf.pages)]
+    raise ValueError(f"unknown extractor {name}")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def worker(name, pdf_path):
+    # runs in the child: cwd is a scratch dir so cropped images don't land in the repo
+    sys.path.insert(0, ROOT)
+    t0 = time.perf_counter()
+    found = _run_extractor(name, pdf_path)
+    elapsed = time.perf_counter() - t0
+    json.dump({"elapsed": elapsed, "rss_mb": _peak_rss_mb(), "found": found}, sys.stdout)
+
+
+def score(truth, found):
+    """
+    recall: share of true question numbers that were extracted
+    precision: share of extracted questions whose number is a true one (and not a duplicate)
+    options: share of true questions whose options were split out exactly (None if not applicable)
+    answers: share of true questions with the right correct answer (None if not applicable)
+    """
+    by_num = {q["number"]: q for q in truth["questions"]}
+    seen, hits = set(), 0
+    for q in found:
+        n = q["number"]
+        if n in by_num and n not in seen:
+            hits += 1
+            seen.add(n)
+    result = {
+        "recall": len(seen) / len(by_num) if by_num else 0.0,
+        "precision": hits / len(found) if found else 0.0,
+        "options": None,
+        "answers": None,
+    }
+    if any(q.get("options") is not None for q in found):
+        first = {}
+        for q in found:
+            first.setdefault(q["number"], q)
+        ok = sum(1 for n, t in by_num.items()
+                 if n in first and [o.strip() for o in (first[n]["options"] or [])] == t["options"])
+        result["options"] = ok / len(by_num)
+    if any("answer" in q for q in found):
+        first = {}
+        for q in found:
+            first.setdefault(q["number"], q)
+        ok = sum(1 for n, t in by_num.items() if n in first and first[n].get("answer") == t["answer"])
+        result["answers"] = ok / len(by_num)
+    return result
+
+
+def run_one(name, pdf_path):
+    with tempfile.TemporaryDirectory() as scratch:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", name, os.path.abspath(pdf_path)],
+                             cwd=scratch, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} failed on {pdf_path}:\n{out.stderr}")
+    return json.loads(out.stdout)
+
+
+def _pct(v):
+    return "-" if v is None else f"{v * 100:.1f}%"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the extractors on a synthetic corpus.")
+    ap.add_argument("corpus", nargs="?", default=os.path.join(ROOT, "benchmarks", "corpus"))
+    ap.add_argument("--extractors", nargs="+", default=EXTRACTORS, choices=EXTRACTORS)
+    ap.add_argument("--json", help="also write the raw results to this file")
+    ap.add_argument("--worker", nargs=2, metavar=("EXTRACTOR", "PDF"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    papers = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+    if not papers:
+        sys.exit(f"no PDFs in {args.corpus}, run make_corpus.py first")
+
+    header = (f"{'paper':<24} {'extractor':<24} {'pages':>5} {'qs':>6} {'sec':>8} {'pages/s':>8} "
+              f"{'qs/s':>8} {'RSS MB':>7} {'recall':>7} {'prec':>7} {'options':>7} {'answers':>7}")
+    print(header)
+    print("-" * len(header))
+    results = []
+    for pdf_path in papers:
+        with open(os.path.splitext(pdf_path)[0] + ".json", encoding="utf-8") as f:
+            truth = json.load(f)
+        pages = truth["pages"]
+        for name in args.extractors:
+            r = run_one(name, pdf_path)
+            acc = score(truth, r["found"])
+            row = {"paper": os.path.basename(pdf_path), "extractor": name, "pages": pages,
+                   "questions": len(r["found"]), "elapsed": r["elapsed"], "rss_mb": r["rss_mb"], **acc}
+            results.append(row)
+            el = max(r["elapsed"], 1e-9)
+            rss = "-" if r["rss_mb"] is None else f"{r['rss_mb']:.0f}"
+            print(f"{row['paper']:<24} {name:<24} {pages:>5} {row['questions']:>6} {el:>8.2f} "
+                  f"{pages / el:>8.1f} {row['questions'] / el:>8.1f} {rss:>7} {_pct(acc['recall']):>7} "
+                  f"{_pct(acc['precision']):>7} {_pct(acc['options']):>7} {_pct(acc['answers']):>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,308 @@
 # data_store.py
 import json
 import os
-from typing import Dict, List
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from atomic_io import CorruptFileError, dump_json, locked, read_json, write_atomic
+from results_journal import ResultsJournal
 
 QUIZ_STORE = "quizzes.json"
-RESULT_STORE = "results.json"
+RESULT_STORE = "results.json"   # compacted results
+RESULT_LOG = "results.log"      # results appended since the last compaction
+RESULT_STATS = "results_stats.json"
+QUIZ_DB = "quizzes.db"
+INDEX_VERSION = 1
+
+# where quizzes live: "sqlite" (QUIZ_DB, quizzes.json is imported on first use)
+# or "json" (QUIZ_STORE, rewritten on every save)
+QUIZ_BACKEND = os.environ.get("QUIZ_BACKEND", "sqlite")
 
 def _read_json(path):
-    if not os.path.exists(path):
-        return []
+    # [] for a missing file; a corrupt one raises CorruptFileError rather than
+    # reading as empty (and being overwritten by the next save)
+    return read_json(path, [])
+
+def _write_json(path, data):
+    dump_json(path, data)
+
+def _file_sig(path):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def _index_entry(quiz, start, end):
+    return [quiz.get("id"), quiz.get("title"), quiz.get("source"), len(quiz.get("questions") or []), start, end]
+
+def _write_quizzes(path, quizzes):
+    """
+    Writes the bank as _write_json does (byte for byte) and returns the index
+    entries: [id, title, source, question_count, start, end], where start:end
+    are the byte offsets of the quiz in the file.
+    """
+    if not quizzes:
+        _write_json(path, quizzes)
         return []
+    parts, index, pos = [], [], 2  # after "[\n"
+    for quiz in quizzes:
+        # json.dump(list, indent=2) is each item dumped with indent=2, shifted in by two spaces
+        chunk = ("  " + json.dumps(quiz, indent=2, ensure_ascii=False).replace("\n", "\n  ")).encode("utf-8")
+        index.append(_index_entry(quiz, pos + 2, pos + len(chunk)))
+        parts.append(chunk)
+        pos += len(chunk) + 2  # ",\n"
+    write_atomic(path, b"[\n" + b",\n".join(parts) + b"\n]")
+    return index
 
-def _write_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+_SEPARATORS = re.compile(r"[\s,]*")
 
-def save_quiz(quiz: Dict):
-    quizzes = _read_json(QUIZ_STORE)
-    # if exists replace, else append
-    found = False
-    for i, q in enumerate(quizzes):
-        if q.get("id") == quiz.get("id"):
-            quizzes[i] = quiz
-            found = True
+def _scan_quizzes(text):
+    # index entries for a file written by something else: each quiz decoded in turn
+    decoder = json.JSONDecoder()
+    index, quizzes = [], []
+    i = text.index("[") + 1
+    pos, byte_pos = 0, 0  # char offset -> utf-8 byte offset, kept up as we go
+    while True:
+        i = _SEPARATORS.match(text, i).end()
+        if text[i] == "]":
             break
-    if not found:
+        quiz, end = decoder.raw_decode(text, i)
+        start = byte_pos + len(text[pos:i].encode("utf-8"))
+        byte_pos, pos = start + len(text[i:end].encode("utf-8")), end
+        index.append(_index_entry(quiz, start, byte_pos))
         quizzes.append(quiz)
-    _write_json(QUIZ_STORE, quizzes)
+        i = end
+    return index, quizzes
+
+class JsonQuizStore:
+    """
+    The whole bank in one JSON file (the original format): every save rewrites it.
+    An index (id, title, source, question_count and where each quiz sits in the
+    file) is kept beside it in <path>.idx and cached in memory while the file's
+    size and mtime are unchanged, so listing the bank reads no question bodies
+    and get_quiz decodes just the quiz asked for.
+    Writes are read-modify-write under a lock on the file, so processes sharing
+    the bank don't lose each other's changes; transaction() batches several.
+    """
+
+    def __init__(self, path: str = QUIZ_STORE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._index = None   # (file sig, index entries)
+        self._quizzes = None  # (file sig, parsed bank) for load_quizzes
+
+    def _save(self, quizzes):
+        index = _write_quizzes(self.path, quizzes)
+        sig = _file_sig(self.path)
+        _write_json(self.index_path, {"version": INDEX_VERSION, "sig": sig, "quizzes": index})
+        self._index = (sig, index)
+
+    def _entries(self):
+        sig = _file_sig(self.path)
+        if sig is None:
+            return []
+        if self._index is not None and self._index[0] == sig:
+            return self._index[1]
+        try:
+            saved = _read_json(self.index_path)
+        except CorruptFileError:
+            saved = None  # only a cache: rebuilt below
+        if isinstance(saved, dict) and saved.get("version") == INDEX_VERSION and saved.get("sig") == sig:
+            index = saved["quizzes"]
+        else:
+            # no index yet, or the file was written without one: build it once
+            try:
+                with open(self.path, "r", encoding="utf-8", newline="") as f:
+                    index, quizzes = _scan_quizzes(f.read())
+            except (ValueError, IndexError) as e:
+                raise CorruptFileError(self.path, e) from e
+            self._quizzes = (sig, quizzes)
+            _write_json(self.index_path, {"version": INDEX_VERSION, "sig": sig, "quizzes": index})
+        self._index = (sig, index)
+        return index
+
+    @contextmanager
+    def transaction(self):
+        """
+        One locked read-modify-write: yields the bank as a list to change in
+        place, written once when the block ends (and not at all if it raises).
+        """
+        with locked(self.path):
+            quizzes = _read_json(self.path)
+            yield quizzes
+            self._save(quizzes)
+
+    def save_quiz(self, quiz: Dict):
+        with self.transaction() as quizzes:
+            # if exists replace, else append
+            found = False
+            for i, q in enumerate(quizzes):
+                if q.get("id") == quiz.get("id"):
+                    quizzes[i] = quiz
+                    found = True
+                    break
+            if not found:
+                quizzes.append(quiz)
+
+    def update_question(self, quiz_id: str, question: Dict) -> bool:
+        with locked(self.path):
+            quizzes = _read_json(self.path)
+            for quiz in quizzes:
+                if quiz.get("id") == quiz_id:
+                    questions = quiz.setdefault("questions", [])
+                    for i, q in enumerate(questions):
+                        if q.get("id") == question.get("id"):
+                            questions[i] = question
+                            break
+                    else:
+                        questions.append(question)
+                    self._save(quizzes)
+                    return True
+            return False
+
+    def delete_quiz(self, quiz_id: str):
+        with self.transaction() as quizzes:
+            quizzes[:] = [q for q in quizzes if q.get("id") != quiz_id]
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        # under the writers' lock, so the file can't be replaced between reading
+        # the index and reading the quiz's byte span
+        with locked(self.path):
+            entry = next((e for e in self._entries() if e[0] == quiz_id), None)
+            if entry is None:
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(entry[4])
+                return json.loads(f.read(entry[5] - entry[4]).decode("utf-8"))
+
+    def load_quizzes(self) -> List[Dict]:
+        """The whole bank, parsed once per change of the file. The dicts are shared: don't modify them."""
+        sig = _file_sig(self.path)
+        if self._quizzes is None or self._quizzes[0] != sig:
+            self._quizzes = (sig, _read_json(self.path))
+        return list(self._quizzes[1])
+
+    def list_quizzes(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        entries = self._entries()
+        page = entries[offset:] if limit is None else entries[offset:offset + limit]
+        return [{"id": i, "title": t, "source": s, "question_count": n} for i, t, s, n, _, _ in page]
+
+    def count_quizzes(self) -> int:
+        return len(self._entries())
+
+    def import_json(self, paths: Iterable[str], force: bool = False) -> int:
+        count = 0
+        with self.transaction() as quizzes:
+            positions = {q.get("id"): i for i, q in enumerate(quizzes)}
+            for path in paths:
+                if os.path.abspath(path) == os.path.abspath(self.path):
+                    continue
+                for quiz in _read_json(path):
+                    if quiz.get("id") in positions:
+                        quizzes[positions[quiz.get("id")]] = quiz
+                    else:
+                        positions[quiz.get("id")] = len(quizzes)
+                        quizzes.append(quiz)
+                    count += 1
+        return count
+
+_store = None
+
+def _open_store():
+    if QUIZ_BACKEND == "json":
+        return JsonQuizStore(QUIZ_STORE)
+    if QUIZ_BACKEND == "sqlite":
+        from sqlite_store import SqliteQuizStore
+        store = SqliteQuizStore(QUIZ_DB)
+        store.import_json([QUIZ_STORE])  # one-time: skipped once the file has been imported
+        return store
+    raise ValueError(f"unknown QUIZ_BACKEND {QUIZ_BACKEND!r}")
+
+def get_store():
+    """The quiz store save_quiz/load_quizzes go through (QUIZ_BACKEND, opened on first use)."""
+    global _store
+    if _store is None:
+        _store = _open_store()
+    return _store
+
+def set_store(store):
+    """Plugs in another backend: anything with the JsonQuizStore methods."""
+    global _store
+    _store = store
+
+def save_quiz(quiz: Dict):
+    get_store().save_quiz(quiz)
+
+def update_question(quiz_id: str, question: Dict) -> bool:
+    """Replaces (by id) or appends one question of a saved quiz; False if the quiz doesn't exist."""
+    return get_store().update_question(quiz_id, question)
+
+def delete_quiz(quiz_id: str):
+    get_store().delete_quiz(quiz_id)
+
+def get_quiz(quiz_id: str) -> Optional[Dict]:
+    return get_store().get_quiz(quiz_id)
 
 def load_quizzes() -> List[Dict]:
-    return _read_json(QUIZ_STORE)
+    return get_store().load_quizzes()
+
+def saved_quizzes() -> List[Dict]:
+    """
+    load_quizzes() for a reader that mustn't create a store: with the sqlite backend
+    and no QUIZ_DB yet, the quizzes.json it would import (or []) instead.
+    """
+    if _store is None and QUIZ_BACKEND == "sqlite" and not os.path.exists(QUIZ_DB):
+        return _read_json(QUIZ_STORE)
+    return load_quizzes()
+
+def list_quizzes(offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+    """A page of { id, title, source, question_count } in save order."""
+    return get_store().list_quizzes(offset, limit)
+
+def count_quizzes() -> int:
+    return get_store().count_quizzes()
+
+def import_json(paths: Iterable[str], force: bool = False) -> int:
+    """Copies quizzes from quizzes.json-style files into the current store."""
+    return get_store().import_json(paths, force)
+
+_results = None
+
+def _results_journal():
+    global _results
+    if _results is None:
+        _results = ResultsJournal(RESULT_STORE, RESULT_LOG, RESULT_STATS)
+    return _results
 
 def save_result(quiz_id: str, quiz_title: str, score: int, total: int):
-    results = _read_json(RESULT_STORE)
-    results.append({
+    # one appended line in RESULT_LOG; folded into results.json when it grows
+    _results_journal().append({
         "quiz_id": quiz_id,
         "quiz_title": quiz_title,
         "score": score,
         "total": total,
         "timestamp": __import__("time").time()
     })
-    _write_json(RESULT_STORE, results)
+
+def save_results(results: Iterable[Dict]):
+    """
+    Appends many results, each { quiz_id, quiz_title, score, total[, timestamp] },
+    in one locked write: for workers saving at a high rate.
+    """
+    now = __import__("time").time()
+    _results_journal().extend([dict({"timestamp": now}, **r) for r in results])
 
 def load_results():
-    return _read_json(RESULT_STORE)
+    return _results_journal().records()
+
+def result_stats(quiz_id: Optional[str] = None):
+    """
+    Per-quiz aggregates { quiz_id, quiz_title, attempts, mean, median, best, histogram }
+    for quiz_id (None if it has no results), or a dict of them for every quiz.
+    """
+    return _results_journal().stats(quiz_id)
+
+def compact_results():
+    _results_journal().compact()
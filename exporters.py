@@ -0,0 +1,133 @@
+# exporters.py
+# Writers for answers and results tables, shared by QuizApp.finish and headless
+# batch runs. An exporter turns (header, rows) into one file; rows may be any
+# iterable and are streamed, never held in a second copy (xlsx uses openpyxl's
+# write-only mode). export() writes several formats in parallel, and
+# export_async() does it off the calling thread:
+#
+#     export_answers(answers)                                  # answers.txt/.csv/.xlsx
+#     export(header, rows, "results", formats=("csv", "xlsx"))
+#     register_exporter("json", MyJsonExporter())
+#
+#   python exporters.py [base]   exports saved results (data_store) to base.csv/.xlsx
+import abc
+import csv
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_io import replace_file
+
+FORMATS = ("txt", "csv", "xlsx")
+ANSWERS_HEADER = ["Question", "Answer"]
+
+
+class Exporter(abc.ABC):
+    """Writes one format. Subclasses implement write(); export() makes it atomic."""
+
+    extension = ""
+
+    @abc.abstractmethod
+    def write(self, path, header, rows):
+        """Writes header and rows to path."""
+
+    def export(self, path, header, rows):
+        # written beside the target and swapped in, so a reader never sees half a file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.write(tmp, header, rows)
+            replace_file(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return path
+
+
+class TxtExporter(Exporter):
+    """One "a-b-..." line per row, no header: the answers.txt format."""
+
+    extension = "txt"
+
+    def write(self, path, header, rows):
+        with open(path, "w") as f:
+            for row in rows:
+                f.write("-".join(str(v) for v in row) + "\n")
+
+
+class CsvExporter(Exporter):
+    extension = "csv"
+
+    def write(self, path, header, rows):
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(rows)
+
+
+class XlsxExporter(Exporter):
+    """openpyxl in write-only mode: rows are streamed out, not built up as a sheet in memory."""
+
+    extension = "xlsx"
+
+    def write(self, path, header, rows):
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Sheet")
+        ws.append(header)
+        for row in rows:
+            ws.append(list(row))
+        wb.save(path)
+
+
+EXPORTERS = {e.extension: e for e in (TxtExporter(), CsvExporter(), XlsxExporter())}
+
+
+def register_exporter(fmt, exporter):
+    """Adds (or replaces) the exporter used for fmt."""
+    EXPORTERS[fmt] = exporter
+
+
+def export(header, rows, base, formats=FORMATS, workers=None):
+    """
+    Writes base.<fmt> for each format, in parallel. rows must be re-iterable (a
+    list or tuple) when there is more than one format. Returns {fmt: path}.
+    """
+    exporters = [(fmt, EXPORTERS[fmt]) for fmt in formats]  # KeyError for an unknown format, before writing
+    if len(exporters) == 1:
+        fmt, exporter = exporters[0]
+        return {fmt: exporter.export(f"{base}.{fmt}", header, rows)}
+    with ThreadPoolExecutor(max_workers=workers or len(exporters)) as pool:
+        futures = {fmt: pool.submit(exporter.export, f"{base}.{fmt}", header, rows) for fmt, exporter in exporters}
+        return {fmt: f.result() for fmt, f in futures.items()}
+
+
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+
+
+def export_async(header, rows, base, formats=FORMATS):
+    """export() in a background thread; returns a concurrent.futures.Future of its result."""
+    return _background.submit(export, header, rows, base, formats)
+
+
+def answer_rows(answers):
+    return sorted(answers.items())
+
+
+def export_answers(answers, base="answers", formats=FORMATS):
+    """{question number: letter} to base.txt/.csv/.xlsx, as QuizApp.finish saves them."""
+    return export(ANSWERS_HEADER, answer_rows(answers), base, formats)
+
+
+def main():
+    import data_store
+    base = sys.argv[1] if len(sys.argv) > 1 else "results"
+    header = ["quiz_id", "quiz_title", "score", "total", "timestamp"]
+    rows = [[r.get(k) for k in header] for r in data_store.load_results()]
+    for fmt, path in export(header, rows, base, formats=("csv", "xlsx")).items():
+        print(f"{fmt}: {path} ({len(rows)} results)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# extract_cache.py
+# On-disk cache of extraction results, keyed by the PDF's content hash plus
+# the extractor name/version and the parameters it ran with.
+import hashlib
+import json
+import os
+
+import image_bundle
+
+CACHE_DIR = ".extract_cache"
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # LRU-evicted above this
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(pdf_path, name, version, params):
+    """
+    Key is "<file hash>-<settings hash>" so all entries of one PDF share a prefix
+    (see invalidate). params must be JSON serialisable.
+    """
+    settings = json.dumps({"name": name, "version": version, "params": params}, sort_keys=True)
+    return file_hash(pdf_path)[:32] + "-" + hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key + ".json")
+
+
+def _image_refs(data):
+    # every string under an "images" key, at any depth
+    refs = []
+    if isinstance(data, dict):
+        for k, v in data.items():
+            if k == "images" and isinstance(v, list):
+                refs.extend(r for r in v if isinstance(r, str))
+            else:
+                refs.extend(_image_refs(v))
+    elif isinstance(data, list):
+        for v in data:
+            refs.extend(_image_refs(v))
+    return refs
+
+
+def image_refs():
+    """All image refs referenced by cache entries (kept alive by image_store GC)."""
+    refs = []
+    if not os.path.isdir(CACHE_DIR):
+        return refs
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(CACHE_DIR, name), "r", encoding="utf-8") as f:
+                refs.extend(_image_refs(json.load(f)))
+        except Exception:
+            pass
+    return refs
+
+
+def load(key):
+    """Returns the cached data or None. A hit refreshes the entry's LRU position."""
+    path = _entry_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    # cropped images live outside the cache; if any were deleted the entry is stale
+    if not all(image_bundle.exists(r) for r in _image_refs(data)):
+        return None
+    os.utime(path)
+    return data
+
+
+def store(key, data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(key)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    evict()
+
+
+def evict(max_bytes=None):
+    """Drops least recently used entries until the cache fits in max_bytes."""
+    if max_bytes is None:
+        max_bytes = CACHE_MAX_BYTES
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        st = os.stat(os.path.join(CACHE_DIR, name))
+        entries.append((st.st_mtime, st.st_size, name))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in entries:
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(CACHE_DIR, name))
+        total -= size
+
+
+def invalidate(pdf_path=None):
+    """Removes the entries of one PDF, or the whole cache when pdf_path is None."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    prefix = file_hash(pdf_path)[:32] + "-" if pdf_path else ""
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name.endswith(".json"):
+            os.remove(os.path.join(CACHE_DIR, name))
+
+
+def cached(pdf_path, name, version, params, compute):
+    """Returns compute() for this PDF/settings, running it only on a cache miss."""
+    key = cache_key(pdf_path, name, version, params)
+    data = load(key)
+    if data is None:
+        data = compute()
+        store(key, data)
+    return data
+
+
+def iter_cached(pdf_path, name, version, params, iterate):
+    """
+    Streaming variant of cached(): yields the items of a cached list, or of
+    iterate() on a miss. The list is stored only if the iteration runs to the
+    end, so an abandoned (cancelled) load never leaves a partial entry.
+    """
+    key = cache_key(pdf_path, name, version, params)
+    data = load(key)
+    if data is not None:
+        yield from data
+        return
+    items = []
+    for item in iterate():
+        items.append(item)
+        yield item
+    store(key, items)
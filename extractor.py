@@ -1,9 +1,18 @@
-import pdfplumber
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
+import extract_cache
+from image_store import store_image
+from pdf_session import open_session
+from spatial import assign_images
+import page_triage
+
+EXTRACTOR_VERSION = 4  # bump when output changes, invalidates cached results
 
 OPTION_PATTERN = re.compile(r"\(\s*[A-D]\s*\)")   # Detects (A) (B) (C) (D)
+QUESTION_PATTERN = re.compile(r"^\s*(\d+)\.")      # Detects question numbers like "1."
+RESOLUTION = 200                                   # DPI used when cropping images
 
 def intersects(a, b):
     return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
@@ -16,51 +25,136 @@ def merge(bboxes):
         max(b[3] for b in bboxes),
     )
 
-def extract_question_blocks(pdf_path, temp_dir="images"):
-    os.makedirs(temp_dir, exist_ok=True)
+def line_extents(chars, line_height=12):
+    """
+    Buckets a page's chars once by text line (int(top / line_height)) and returns
+    {line: (x0, top, x1, bottom)}, the extent of each line's chars.
+    """
+    extents = {}
+    for c in chars:
+        line = int(c["top"] / line_height)
+        e = extents.get(line)
+        if e is None:
+            extents[line] = (c["x0"], c["top"], c["x1"], c["bottom"])
+        else:
+            extents[line] = (min(e[0], c["x0"]), min(e[1], c["top"]),
+                             max(e[2], c["x1"]), max(e[3], c["bottom"]))
+    return extents
 
+def _extract_page(doc, page_index, temp_dir, triage=True):
     questions = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
-            text_lines = page.extract_text().split("\n")
-            char_lines = page.chars
-
-            # Detect question numbers like "1."
-            q_positions = []
-            for i, line in enumerate(text_lines):
-                m = re.match(r"^\s*(\d+)\.", line)
-                if m:
-                    q_positions.append((i, int(m.group(1))))
-
-            for i in range(len(q_positions)):
-                start_i, qnum = q_positions[i]
-                end_i = q_positions[i+1][0] if i+1 < len(q_positions) else len(text_lines)
-
-                block_text = "\n".join(text_lines[start_i:end_i])
-
-                # detect location of block in page
-                block_chars = [c for c in char_lines if start_i <= int(c["top"] / 12) < end_i]
-                if not block_chars:
-                    continue
-                bbox = merge([(c["x0"], c["top"], c["x1"], c["bottom"]) for c in block_chars])
-
-                imgs = []
-                for idx, im in enumerate(page.images):
-                    ib = (im["x0"], im["top"], im["x1"], im["bottom"])
-                    if intersects(bbox, ib):
-                        try:
-                            cropped = page.within_bbox(ib).to_image(resolution=200).original
-                            fp = f"{temp_dir}/q{qnum}_p{page_index}_{idx}.png"
-                            cropped.save(fp)
-                            imgs.append(fp)
-                        except:
-                            pass
-
-                questions.append({
-                    "number": qnum,
-                    "text": block_text,
-                    "images": imgs
-                })
+    # cover/instruction/answer-key/scanned pages: skip the expensive part
+    if triage and doc.label(page_index) != page_triage.TEXT_QUESTION:
+        return questions
+
+    text_lines = doc.text(page_index).split("\n")
+    char_lines = line_extents(doc.chars(page_index))
+    renderer = doc.renderer(page_index)  # page is rasterised at most once
+
+    # Detect question numbers like "1."
+    q_positions = []
+    for i, line in enumerate(text_lines):
+        m = QUESTION_PATTERN.match(line)
+        if m:
+            q_positions.append((i, int(m.group(1))))
+
+    blocks = []
+    for i in range(len(q_positions)):
+        start_i, qnum = q_positions[i]
+        end_i = q_positions[i+1][0] if i+1 < len(q_positions) else len(text_lines)
+
+        block_text = "\n".join(text_lines[start_i:end_i])
+
+        # detect location of block in page: range lookup over the line extents
+        block_lines = [char_lines[ln] for ln in range(start_i, end_i) if ln in char_lines]
+        if not block_lines:
+            continue
+        bbox = merge(block_lines)
+        blocks.append((qnum, block_text, bbox))
+
+    image_bboxes = [(im["x0"], im["top"], im["x1"], im["bottom"]) for im in doc.images(page_index)]
+    hits = assign_images([bbox for _, _, bbox in blocks], image_bboxes)
+
+    for (qnum, block_text, bbox), block_hits in zip(blocks, hits):
+        imgs = []
+        for idx in block_hits:
+            try:
+                cropped = renderer.crop(image_bboxes[idx], RESOLUTION)
+                # into the PDF's image bundle, by pixel hash: repeated logos/headers are stored once
+                imgs.append(store_image(cropped, temp_dir, doc.path))
+            except:
+                pass
+
+        questions.append({
+            "number": qnum,
+            "text": block_text,
+            "images": imgs
+        })
 
     return questions
+
+def _extract_page_range(pdf_path, page_indexes, temp_dir, triage=True):
+    # runs inside a worker process: every worker opens the PDF on its own,
+    # pdfplumber objects can't be pickled across processes
+    results = []
+    with open_session(pdf_path) as doc:
+        for page_index in page_indexes:
+            results.append(_extract_page(doc, page_index, temp_dir, triage))
+    return results
+
+def _page_count(pdf_path):
+    with open_session(pdf_path) as doc:
+        return doc.page_count
+
+def iter_question_blocks(pdf_path, temp_dir="images", workers=None, on_page=None, triage=True):
+    """
+    Yields questions as soon as their page is done, in page order.
+    workers: number of processes to shard pages across. None/1 runs serially.
+    The output is the same either way.
+    on_page(page_index, page_count) is called after each page is yielded.
+    triage: only pages page_triage labels as text-question are extracted.
+    """
+    os.makedirs(temp_dir, exist_ok=True)
+
+    if not workers or workers <= 1:
+        with open_session(pdf_path) as doc:
+            page_count = doc.page_count
+            for page_index in doc.page_numbers:
+                yield from _extract_page(doc, page_index, temp_dir, triage)
+                if on_page:
+                    on_page(page_index, page_count)
+        return
+
+    page_numbers = list(range(1, _page_count(pdf_path) + 1))
+    # contiguous chunks, a few per worker so a slow page doesn't stall the pool
+    chunk = max(1, len(page_numbers) // (workers * 4))
+    chunks = [page_numbers[i:i + chunk] for i in range(0, len(page_numbers), chunk)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_page_range, pdf_path, c, temp_dir, triage) for c in chunks]
+        try:
+            for c, fut in zip(chunks, futures):
+                for page_index, page_questions in zip(c, fut.result()):
+                    yield from page_questions
+                    if on_page:
+                        on_page(page_index, len(page_numbers))
+        finally:
+            # consumer stopped early: don't run the remaining chunks
+            for fut in futures:
+                fut.cancel()
+
+def extract_question_blocks(pdf_path, temp_dir="images", workers=None, triage=True):
+    return list(iter_question_blocks(pdf_path, temp_dir, workers, triage=triage))
+
+def _cache_params(temp_dir):
+    return {"temp_dir": temp_dir, "resolution": RESOLUTION, "question": QUESTION_PATTERN.pattern,
+            "triage": page_triage.TRIAGE_VERSION}
+
+def iter_question_blocks_cached(pdf_path, temp_dir="images", workers=None, on_page=None):
+    """Same as iter_question_blocks, served from extract_cache when the PDF is unchanged."""
+    return extract_cache.iter_cached(pdf_path, "extractor", EXTRACTOR_VERSION, _cache_params(temp_dir),
+                                     lambda: iter_question_blocks(pdf_path, temp_dir, workers, on_page))
+
+def extract_question_blocks_cached(pdf_path, temp_dir="images", workers=None):
+    return list(iter_question_blocks_cached(pdf_path, temp_dir, workers))
@@ -0,0 +1,156 @@
+# image_bundle.py
+# One file of images per source document. Crops cut from a PDF are stored as
+# PNG blobs in <store_dir>/<pdf name>-<path hash>.imgdb, an SQLite table keyed
+# by the hash of the pixels (so a crop repeated on every page is stored once).
+# Other kinds of image (page previews) get a bundle of their own beside it,
+# <pdf name>-<path hash>.<kind>.imgdb, so they never share a file with crops.
+# Questions refer to an image as "<bundle path>#<key>"; open_image() reads it
+# back through one open handle per bundle with an indexed lookup. Plain file
+# paths (loose PNGs from before bundles) are still accepted everywhere.
+#
+# Extraction workers in several processes can add to the same bundle: SQLite
+# serialises the inserts with its file locks. Bundles use the rollback journal
+# (journal_mode=TRUNCATE), not WAL: WAL needs memory shared between the processes
+# on one host and doesn't work on network filesystems, where stores may live.
+# The rollback journal still relies on the share's file locking; a share
+# without working locks (some NFS setups) should only be written by one process.
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+
+from PIL import Image
+
+BUNDLE_EXT = ".imgdb"
+REF_SEP = "#"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    key    TEXT PRIMARY KEY,   -- image_hash of the pixels
+    format TEXT NOT NULL,
+    width  INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    data   BLOB NOT NULL
+);
+"""
+
+
+def image_hash(im):
+    h = hashlib.sha1()
+    h.update(f"{im.mode}:{im.size[0]}x{im.size[1]}:".encode("ascii"))
+    h.update(im.tobytes())
+    return h.hexdigest()
+
+
+def bundle_path(store_dir, source, kind=None):
+    """The bundle for the document at source (a path) inside store_dir; kind names a separate one."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    tag = hashlib.sha1(os.path.realpath(source).encode("utf-8")).hexdigest()[:8]
+    suffix = f".{kind}" if kind else ""
+    return os.path.join(store_dir, f"{stem}-{tag}{suffix}{BUNDLE_EXT}")
+
+
+def make_ref(path, key):
+    return f"{path}{REF_SEP}{key}"
+
+
+def split_ref(ref):
+    """(bundle path, key) for a bundle ref, (None, ref) for a plain file path."""
+    path, sep, key = ref.rpartition(REF_SEP)
+    if sep and path.endswith(BUNDLE_EXT):
+        return path, key
+    return None, ref
+
+
+class ImageBundle:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=TRUNCATE")  # not WAL, see above
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._known = set()  # keys this handle has stored or seen
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def put(self, im, format="PNG"):
+        """Stores a PIL image unless an identical one is already there. Returns its ref."""
+        key = image_hash(im)
+        if key not in self._known and key not in self:
+            buf = io.BytesIO()
+            im.save(buf, format=format)
+            with self._lock:
+                self._conn.execute("INSERT OR IGNORE INTO images VALUES (?, ?, ?, ?, ?)",
+                                   (key, format, im.size[0], im.size[1], buf.getvalue()))
+        self._known.add(key)
+        return make_ref(self.path, key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM images WHERE key = ?", (key,)).fetchone() is not None
+
+    def read(self, key):
+        """The stored (encoded) bytes, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM images WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def open(self, key):
+        data = self.read(key)
+        if data is None:
+            raise KeyError(f"{key} not in {self.path}")
+        return Image.open(io.BytesIO(data))
+
+    def keys(self):
+        with self._lock:
+            return [k for (k,) in self._conn.execute("SELECT key FROM images")]
+
+    def delete(self, keys):
+        keys = list(keys)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("DELETE FROM images WHERE key = ?", ((k,) for k in keys))
+            self._conn.execute("COMMIT")
+        self._known.difference_update(keys)
+
+
+_bundles = {}  # abspath -> (pid, ImageBundle): one handle per bundle per process
+_bundles_lock = threading.Lock()
+
+
+def get_bundle(path):
+    """The open handle for the bundle at path (opened, or created, on first use)."""
+    key = os.path.abspath(path)
+    with _bundles_lock:
+        hit = _bundles.get(key)
+        # a connection inherited from the parent by a forked worker must not be used
+        if hit is None or hit[0] != os.getpid():
+            hit = _bundles[key] = (os.getpid(), ImageBundle(path))
+        return hit[1]
+
+
+def close_bundle(path):
+    with _bundles_lock:
+        hit = _bundles.pop(os.path.abspath(path), None)
+    if hit is not None and hit[0] == os.getpid():
+        hit[1].close()
+
+
+def open_image(ref):
+    """A PIL image for a bundle ref or a plain file path."""
+    path, key = split_ref(ref)
+    if path is None:
+        return Image.open(ref)
+    return get_bundle(path).open(key)
+
+
+def exists(ref):
+    path, key = split_ref(ref)
+    if path is None:
+        return os.path.exists(ref)
+    return os.path.exists(path) and key in get_bundle(path)
@@ -0,0 +1,96 @@
+# image_store.py
+# Content-addressed storage for cropped figures. Crops from a PDF go into that
+# PDF's image bundle in store_dir (see image_bundle), named by the hash of their
+# pixels, so a header/logo repeated on every page is encoded and written once
+# and crops from different PDFs never overwrite each other. Without a source
+# document a crop is saved as <store_dir>/<hash>.png, as before bundles.
+#
+#   python image_store.py [store_dir]   deletes the images nothing references
+#                                       (collect_garbage; default store_dir "images")
+import os
+import sys
+
+from image_bundle import BUNDLE_EXT, bundle_path, close_bundle, get_bundle, image_hash, make_ref, split_ref
+
+_written = set()  # paths this process already stored, skips the exists() check
+
+
+def store_image(im, store_dir, source=None, kind=None):
+    """
+    Saves a PIL image unless an identical one is already stored. Returns its
+    ref: an entry in the bundle of source (the PDF it was cut from), else a path.
+    kind keeps other images of source (e.g. "previews") in a bundle of their own.
+    """
+    if source is not None:
+        return get_bundle(bundle_path(store_dir, source, kind)).put(im)
+    path = os.path.join(store_dir, image_hash(im) + ".png")
+    if path in _written:
+        return path
+    if not os.path.exists(path):
+        # write then rename: parallel extraction workers may store the same crop
+        tmp = f"{path}.{os.getpid()}.tmp"
+        im.save(tmp, format="PNG")
+        os.replace(tmp, path)
+    _written.add(path)
+    return path
+
+
+def _referenced_paths(extra_refs=()):
+    # images referenced by saved quizzes and by cached extraction results
+    import data_store
+    import extract_cache
+    refs = set(extract_cache._image_refs(data_store.saved_quizzes()))  # doesn't create quizzes.db
+    refs.update(extract_cache.image_refs())
+    refs.update(extra_refs)
+    keep = set()
+    for ref in refs:
+        path, key = split_ref(ref)
+        keep.add(os.path.abspath(ref) if path is None else (os.path.abspath(path), key))
+    return keep
+
+
+def _remove_bundle(path):
+    close_bundle(path)
+    for p in (path, path + "-journal", path + "-wal", path + "-shm"):  # -wal/-shm: bundles from WAL days
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def collect_garbage(store_dir, extra_refs=()):
+    """
+    Deletes stored images that no saved quiz or cached extraction references,
+    and bundles left empty. extra_refs: more refs to keep (e.g. questions
+    currently open in the GUI). Returns the list of removed refs.
+    Crops of an extraction still running aren't cached yet: don't collect then.
+    """
+    if not os.path.isdir(store_dir):
+        return []
+    keep = _referenced_paths(extra_refs)
+    removed = []
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name.endswith(BUNDLE_EXT):
+            bundle = get_bundle(path)
+            abspath = os.path.abspath(path)
+            keys = bundle.keys()
+            dead = [k for k in keys if (abspath, k) not in keep]
+            if len(dead) == len(keys):
+                _remove_bundle(path)
+            else:
+                bundle.delete(dead)
+            removed.extend(make_ref(bundle.path, k) for k in dead)
+        elif name.endswith(".png") and os.path.abspath(path) not in keep:
+            os.remove(path)
+            _written.discard(path)
+            removed.append(path)
+    return removed
+
+
+def main():
+    store_dir = sys.argv[1] if len(sys.argv) > 1 else "images"
+    removed = collect_garbage(store_dir)
+    print(f"{store_dir}: removed {len(removed)} unreferenced images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# line_grouping.py
+# Array-backed grouping of pdfplumber chars into text lines.
+from operator import itemgetter
+
+import numpy as np
+
+LINE_TOLERANCE = 0.5  # chars whose tops are within this many points chain into one line
+
+_FIELDS = itemgetter("x0", "top", "x1", "bottom", "text")
+
+
+def group_chars(chars, y_tolerance=LINE_TOLERANCE):
+    """
+    Returns list of lines top to bottom, each { 'text':..., 'chars': [char dicts], 'bbox': (x0,top,x1,bottom) }
+    with the chars of a line ordered left to right.
+
+    Chars are sorted by top and a new line starts wherever the gap to the
+    previous char's top is larger than y_tolerance (so a line may drift by more
+    than y_tolerance in total, unlike bucketing on round(top)). Ordering and
+    line bboxes are computed with NumPy; only the final dicts are built in Python.
+    Against the old dict/round(top) grouping (benchmarks/bench_line_grouping.py)
+    that is about 1.5x faster on pages of 1k-5k chars, but only about 1.1x at
+    50k chars, where building the line dicts dominates.
+    """
+    if not chars:
+        return []
+
+    # one pass over the dicts, everything after this works on arrays
+    x0s, tops, x1s, bottoms, texts = zip(*map(_FIELDS, chars))
+    x0s = np.fromiter(x0s, dtype=np.float64, count=len(chars))
+    tops = np.fromiter(tops, dtype=np.float64, count=len(chars))
+
+    by_top = np.argsort(tops, kind="stable")
+    new_line = np.diff(tops[by_top]) > y_tolerance
+    line_id = np.empty(len(chars), dtype=np.int64)
+    line_id[by_top] = np.concatenate(([0], np.cumsum(new_line)))
+
+    # line by line, left to right inside a line (lexsort is stable)
+    order = np.lexsort((x0s, line_id))
+    starts = np.flatnonzero(np.r_[True, np.diff(line_id[order]) != 0])
+
+    x0 = np.minimum.reduceat(x0s[order], starts).tolist()
+    top = np.minimum.reduceat(tops[order], starts).tolist()
+    x1 = np.maximum.reduceat(np.fromiter(x1s, dtype=np.float64, count=len(chars))[order], starts).tolist()
+    bottom = np.maximum.reduceat(np.fromiter(bottoms, dtype=np.float64, count=len(chars))[order], starts).tolist()
+
+    order = order.tolist()
+    rows = [chars[i] for i in order]
+    texts = [texts[i] for i in order]
+    bounds = starts.tolist() + [len(order)]
+    lines = []
+    for n in range(len(starts)):
+        a, b = bounds[n], bounds[n + 1]
+        lines.append({
+            "text": "".join(texts[a:b]),
+            "chars": rows[a:b],
+            "bbox": (x0[n], top[n], x1[n], bottom[n]),
+        })
+    return lines
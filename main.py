@@ -1,103 +1,95 @@
 # main.py
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
-import os
-import PyPDF2
+from PIL import ImageTk
+import re
 
-# try to import your pdf_processor.extract_pages_with_images to get page images
+# try to import pdf_processor.page_previews to get page images
 try:
-    from pdf_processor import extract_pages_with_images
+    from pdf_processor import page_previews
     have_pdf_processor = True
 except Exception:
     have_pdf_processor = False
 
-from parser import parse_questions_from_text
+from parser import IncrementalParser, QUESTION_START_RE, apply_answer_key
+from pdf_session import open_session
+from image_bundle import exists, open_image
+import extract_cache
+
+PARSE_VERSION = 4  # bump when parsing output changes, invalidates cached results
+# 2: "text" is the question stem, without its options (single-pass lexer)
+# 3: entries cached by builds that had the stem change without a version bump are dropped
+# 4: ratio and power-of-ten options no longer start the answer key
+
+# a question number where a page mentions it: "12. " or "Q12. " at the start of a line
+PAGE_QUESTION_RE = re.compile(r'(?m)^[ \t]*(?:Q[ \t]*)?(\d+)\.\s')
 
 # global state
 questions = []
-page_images = {}  # page_num -> image path or PIL.Image
+page_images = {}  # page_num -> image ref (image_bundle) or path
 current_idx = 0
 
-def extract_text_with_pypdf2(pdf_path):
-    text_pages = []
-    with open(pdf_path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        for p in reader.pages:
-            try:
-                text_pages.append(p.extract_text() or "")
-            except Exception:
-                text_pages.append("")
-    full_text = "\n\n".join(text_pages)
-    return full_text, text_pages
-
 def load_pdf():
-    global questions, current_idx, page_images
     path = filedialog.askopenfilename(filetypes=[("PDF files","*.pdf")])
     if not path:
         return
     status_label.config(text="Extracting text...")
     root.update_idletasks()
 
-    full_text, page_texts = extract_text_with_pypdf2(path)
-    # parse questions
-    parsed = parse_questions_from_text(full_text)
+    # text and page images come from one open of the file (pdf_processor joins this session)
+    with open_session(path) as doc:
+        _load_pdf(path, doc)
+
+def _load_pdf(path, doc):
+    global questions, current_idx, page_images
+    # text extraction + parsing are cached per PDF content (see extract_cache)
+    def compute():
+        page_texts, parsed = [], []
+        parser = IncrementalParser()  # carries only the open question between pages
+        for n in doc.page_numbers:  # one page at a time, parsing starts right away
+            text = doc.stream_text(n)  # PyPDF2 keeps two-column text in reading order
+            page_texts.append(text)
+            parsed.extend(parser.feed(text))
+        parsed.extend(parser.close())
+        apply_answer_key(parsed, parser.answer_key)  # "ANSWER KEY" table at the back
+        return {"page_texts": page_texts, "questions": parsed}
+    data = extract_cache.cached(path, "main", PARSE_VERSION, {"reader": "PyPDF2", "question": QUESTION_START_RE.pattern}, compute)
+    page_texts = data["page_texts"]
+    parsed = data["questions"]
     if not parsed:
         messagebox.showerror("No questions", "No questions were parsed from this PDF.")
         status_label.config(text="Ready")
         return
 
-    # try to get page images for preview (if pdf_processor available)
+    # try to get page images for preview (if pdf_processor available); rendered
+    # on the first load of a PDF only, then cached with its content hash
     page_images = {}
     if have_pdf_processor:
         try:
-            pages = extract_pages_with_images(path, ocr_on_image_pages=False)  # if your function supports this arg; else just call without
-            # pages is expected list of dicts with page_num and page_image
-            for p in pages:
-                if isinstance(p, dict) and p.get("page_image"):
-                    page_images[p.get("page_num")] = p.get("page_image")
-        except TypeError:
-            # fallback if signature different: call with single arg
-            try:
-                pages2 = extract_pages_with_images(path)
-                for p in pages2:
-                    if isinstance(p, dict) and p.get("page_image"):
-                        page_images[p.get("page_num")] = p.get("page_image")
-            except Exception:
-                page_images = {}
+            page_images = page_previews(path)
         except Exception:
             page_images = {}
 
-    # we don't have precise question->page mapping from parser, so we will attach no image
-    # But we can attempt to match question numbers to page_texts: if a page contains the question number, map it.
+    # the parser doesn't keep pages: map each question number to the first page it starts on
+    page_index = build_question_page_index(page_texts)
     for q in parsed:
-        qnum = q.get("number")
-        q["page_num"] = None
-        if qnum is not None:
-            for i, ptext in enumerate(page_texts, start=1):
-                if re_search_question_number_in_page(ptext, qnum):
-                    q["page_num"] = i
-                    break
+        q["page_num"] = page_index.get(q.get("number"))
 
     questions = parsed
     current_idx = 0
     status_label.config(text=f"Parsed {len(questions)} questions")
     show_question()
 
-import re
-def re_search_question_number_in_page(page_text, qnum):
-    # crude check: look for "qnum." or "qnum )" in page text
-    if not page_text:
-        return False
-    patterns = [rf'\n\s*{qnum}\.\s', rf'^{qnum}\.\s', rf'\n\s*{qnum}\s*\)', rf'\n\s*Q\s*{qnum}\.']
-    for pat in patterns:
-        if re.search(pat, page_text, flags=re.MULTILINE):
-            return True
-    # fallback simple contains (may be noisy)
-    # look for " qnum." anywhere
-    if f"{qnum}." in page_text:
-        return True
-    return False
+def build_question_page_index(page_texts):
+    """
+    question number -> 1-based number of the first page where it starts,
+    from one scan of every page.
+    """
+    index = {}
+    for i, ptext in enumerate(page_texts, start=1):
+        for m in PAGE_QUESTION_RE.finditer(ptext or ""):
+            index.setdefault(int(m.group(1)), i)
+    return index
 
 def show_question():
     global current_idx
@@ -118,9 +110,9 @@ def show_question():
     image_label.config(image="")
     image_label.image = None
     pnum = q.get("page_num")
-    if pnum and pnum in page_images and os.path.exists(page_images[pnum]):
+    if pnum and pnum in page_images and exists(page_images[pnum]):
         try:
-            pil = Image.open(page_images[pnum])
+            pil = open_image(page_images[pnum])
             pil.thumbnail((380,380))
             tkimg = ImageTk.PhotoImage(pil)
             image_label.config(image=tkimg)
@@ -0,0 +1,54 @@
+# page_render.py
+# Rasterise a PDF page at most once per resolution and cut figures out of that raster.
+#
+# page.within_bbox(bbox).to_image(resolution=...) renders the *whole* page and then
+# crops it, so calling it once per figure re-renders the same page over and over.
+
+
+def _check_bbox(bbox, page_bbox):
+    # same rules as pdfplumber's strict within_bbox: non-empty and fully on the page
+    x0, top, x1, bottom = bbox
+    if (x1 - x0) * (bottom - top) == 0:
+        raise ValueError(f"Bounding box {bbox} has an area of zero.")
+    if x0 < page_bbox[0] or top < page_bbox[1] or x1 > page_bbox[2] or bottom > page_bbox[3]:
+        raise ValueError(f"Bounding box {bbox} is not fully within page bounding box {page_bbox}")
+
+
+class PageRenderer:
+    """
+    Renders one pdfplumber page lazily (only once a crop is asked for) and
+    serves crops as PIL slices of that raster. crop() returns the same pixels as
+    page.within_bbox(bbox).to_image(resolution=resolution).original, and is
+    memoized per bbox so an image touching several question blocks is cut once.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._rasters = {}  # resolution -> PIL image of the full page
+        self._crops = {}    # (bbox, resolution) -> PIL image
+
+    def render(self, resolution):
+        im = self._rasters.get(resolution)
+        if im is None:
+            im = self.page.to_image(resolution=resolution).original
+            self._rasters[resolution] = im
+        return im
+
+    def crop(self, bbox, resolution):
+        bbox = tuple(bbox)
+        key = (bbox, resolution)
+        if key in self._crops:
+            return self._crops[key]
+        _check_bbox(bbox, self.page.bbox)
+        raster = self.render(resolution)
+        scale = raster.size[0] / self.page.width
+        px0, ptop = self.page.bbox[0], self.page.bbox[1]
+        cropbox = (
+            (bbox[0] - px0) * scale,
+            (bbox[1] - ptop) * scale,
+            (bbox[2] - px0) * scale,
+            (bbox[3] - ptop) * scale,
+        )
+        im = raster.crop(tuple(map(int, cropbox)))
+        self._crops[key] = im
+        return im
@@ -0,0 +1,99 @@
+# page_triage.py
+# Cheap first pass that labels every page before the expensive extraction work
+# (extract_text, image enumeration, rendering, OCR) is spent on it.
+import re
+
+import extract_cache
+from parser import ANSWER_KEY_HEADING_RE, count_key_entries
+
+TRIAGE_VERSION = 2  # bump when the rules change, invalidates cached labels
+# 2: key entries and heading as parser reads them; numeric answers count as questions
+
+TEXT_QUESTION = "text-question"  # has a text layer and question numbers
+SCANNED = "scanned"              # (almost) no text, page covered by an image: needs OCR
+FIGURE_ONLY = "figure-only"      # no text, only figures
+ANSWER_KEY = "answer-key"        # "1. (3) 2. (1) ..." tables
+SKIP = "skip"                    # blank and cover pages: no question numbers or options
+
+MIN_TEXT_CHARS = 20      # fewer chars than this means no usable text layer
+SCANNED_IMAGE_RATIO = 0.5  # share of the page covered by images for a scan
+MIN_KEY_ENTRIES = 5
+
+# "12. A block", "Q3) [Figure]", "12. 2 kg block" (but not the "2." of "2.5")
+QUESTION_RE = re.compile(r'(?:^|\s)Q?\s*\d{1,3}\s*[\.\)](?:\s*(?=[A-Za-z\[])|\s+(?=\d))')
+OPTION_RE = re.compile(r'\(\s*(?:[1-4]|[A-Da-d])\s*\)')
+
+
+def _line_texts(chars):
+    # rough reading-order text: chars bucketed by rounded top, spaces at gaps
+    rows = {}
+    for c in chars:
+        rows.setdefault(int(round(c["top"])), []).append(c)
+    lines = []
+    for k in sorted(rows):
+        row = sorted(rows[k], key=lambda c: c["x0"])
+        parts, prev_x1 = [], None
+        for c in row:
+            if prev_x1 is not None and c["x0"] - prev_x1 > 1.5:
+                parts.append(" ")
+            parts.append(c["text"])
+            prev_x1 = c["x1"]
+        lines.append("".join(parts))
+    return lines
+
+
+def page_signals(page):
+    """The cheap measurements classify_page decides on."""
+    chars = page.chars
+    page_area = max(page.width * page.height, 1)
+    image_area = sum(max(im["x1"] - im["x0"], 0) * max(im["bottom"] - im["top"], 0) for im in page.images)
+    lines = _line_texts(chars) if chars else []
+    text = "\n".join(lines)
+    return {
+        "chars": len(chars),
+        "images": len(page.images),
+        "image_ratio": min(image_area / page_area, 1.0),
+        "question_hits": sum(len(QUESTION_RE.findall(ln)) for ln in lines),
+        "option_hits": sum(len(OPTION_RE.findall(ln)) for ln in lines),
+        "key_hits": count_key_entries(text),  # "12. (3)", "12-C"; not "(1) 1:2" or "10-3 N"
+        "key_heading": ANSWER_KEY_HEADING_RE.search(text) is not None,
+    }
+
+
+def classify_signals(s):
+    if s["chars"] < MIN_TEXT_CHARS:
+        if s["image_ratio"] >= SCANNED_IMAGE_RATIO:
+            return SCANNED
+        if s["images"]:
+            return FIGURE_ONLY
+        return SKIP
+    # key tables are mostly "n. (x)" pairs: they outnumber real question starts
+    if s["key_hits"] >= MIN_KEY_ENTRIES and (s["key_heading"] or s["key_hits"] > 2 * s["question_hits"]):
+        return ANSWER_KEY
+    if s["question_hits"] == 0 and s["option_hits"] == 0:
+        return FIGURE_ONLY if s["images"] else SKIP
+    # anything else that could hold questions gets the full extraction: numeric-answer
+    # sections without options, and pages that only continue a question's options
+    return TEXT_QUESTION
+
+
+def classify_page(page):
+    return classify_signals(page_signals(page))
+
+
+def triage(pdf):
+    """Labels for every page of an open pdfplumber PDF, in page order."""
+    return [classify_page(page) for page in pdf.pages]
+
+
+def triage_pdf(pdf_path):
+    """Page labels for a PDF file, cached by content hash in extract_cache."""
+    from pdf_session import open_session
+
+    def compute():
+        with open_session(pdf_path) as doc:
+            return [doc.label(n) for n in doc.page_numbers]
+
+    params = {"min_text_chars": MIN_TEXT_CHARS, "scanned_image_ratio": SCANNED_IMAGE_RATIO,
+              "min_key_entries": MIN_KEY_ENTRIES}
+    return extract_cache.cached(pdf_path, "page_triage", TRIAGE_VERSION, params, compute)
@@ -1,139 +1,346 @@
 # parser.py
 import re
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 
 # Patterns
 # question start like "1." at line start
 QUESTION_START_RE = re.compile(r'(?m)^\s*(\d+)\.\s*')
 
-# line-start option like "(1) text" or "1) text"
-LINE_OPTION_RE = re.compile(r'(?m)^\s*\(?\s*([1-9])\s*\)?\s*[\.\)]?\s*(.+)$')
+# Single-pass lexer for a question block. One scan finds every option marker:
+#  paren  "(1)".."(4)" / "(A)".."(D)" anywhere (inline options)
+#  line   "1)" / "A." / "a)" at the start of a line (the match includes its newline)
+# Everything between markers is stem or option text.
+MARKER_RE = re.compile(
+    r'\(\s*(?P<paren>[1-4A-Da-d])\s*\)'
+    r'|\n[ \t]*(?P<line>[1-4A-Da-d])[ \t]*[\.\)](?=\s)'
+)
+# answer marker: "Ans. (2)", "Answer: A,C", "Ans 2". Only tried where str.find sees
+# "ans", which is much cheaper than one more alternative in MARKER_RE.
+ANS_RE = re.compile(
+    r'ans(?:wer)?\b\s*[:\.\-]?\s*\(?\s*'
+    r'(?P<ans_val>[A-D0-9](?:[\s,]*[A-D0-9](?![A-Z0-9]))*)\s*\)?',
+    re.IGNORECASE,
+)
 
-# inline options like "(1) opt1 (2) opt2 (3) opt3 (4) opt4"
-INLINE_NUMERIC_OPTIONS_RE = re.compile(r'\(\s*([1-9])\s*\)\s*([^\(]+)')
+# end-of-document answer key: a heading line of its own, then a compact "1. (3) 2. (1) ..." table
+ANSWER_KEY_HEADING_RE = re.compile(r'(?im)^[ \t]*(?:answer[ \t]*key|answers?)[ \t]*[:\-]?[ \t]*$')
+# one key entry: "12. (3)", "12.(C)", "12-C", "12: (1,3)". After a "." the answer must be
+# in brackets, or "26. A solenoid ..." would read as an entry. The lookbehind sits after
+# the first digit so the regex engine can skip ahead to digits.
+_KEY_VALUE = r'([1-4A-Da-d](?:\s*,\s*[1-4A-Da-d])*)'
+KEY_ENTRY_RE = re.compile(
+    r'(\d(?<![\w.]\d)\d{0,3})\s*(?:\.\s*\(\s*' + _KEY_VALUE + r'\s*\)'
+    r'|[\-:]\s*\(?\s*' + _KEY_VALUE + r'(?![\w.])\s*\)?)'
+)
+MIN_KEY_ENTRIES = 5  # a page without a heading needs this many entries to count as a key
+# bare "n-x"/"n:x" entries that are really option values: a ratio after an option
+# marker ("(1) 1:2", "(2) √3:1"; not the "(3)" value of "3: (3)") or a power of ten
+# before its unit ("10-3 N")
+_OPTION_BEFORE_RE = re.compile(
+    r'(?:(?<![\-:.])(?<![\-:.]\s)\(\s*[1-4A-Da-d]\s*\)|(?<![\w.(])[1-4A-Da-d][\.\)])\s*[^\w\s]?$'
+)
+_WORD_AFTER_RE = re.compile(r'[ \t]*[A-Za-z]')
 
-# alternative: A. / (A) style
-LINE_ALPHA_OPTION_RE = re.compile(r'(?m)^\s*\(?\s*([A-Da-d])\s*\)?\s*[\.\)]?\s*(.+)$')
-INLINE_ALPHA_OPTIONS_RE = re.compile(r'\(\s*([A-Da-d])\s*\)\s*([^(\n]+)')
+MAX_OPTIONS = 4
+# marker label -> (style, 0-based position in its sequence)
+_NUM, _ALPHA = 0, 1
+_LABELS = {**{str(i + 1): (_NUM, i) for i in range(MAX_OPTIONS)},
+           **{c: (_ALPHA, i) for i, c in enumerate("ABCD")},
+           **{c: (_ALPHA, i) for i, c in enumerate("abcd")}}
 
-# answer patterns (Ans., Answer, Ans)
-ANS_RE = re.compile(r'(?i)ans(?:wer)?\s*[:\.\-]?\s*\(?\s*([A-Da-d0-9, ]+)\s*\)?')
+def _clean(s: str) -> str:
+    # collapse runs of whitespace; most option texts only need the strip
+    s = s.strip()
+    if "\n" in s or "  " in s or "\t" in s:
+        return " ".join(s.split())
+    return s
+
+def _answer_indices(ans_text: str, n_options: int) -> Optional[object]:
+    # Ans can be "2" or "2,4" or "A" or "A,C": 0-based int, list for several, None if unusable
+    indices = []
+    for p in re.split(r'[,\s]+', ans_text.strip()):
+        if not p:
+            continue
+        if p.isdigit():
+            val = int(p) - 1
+        else:
+            val = ord(p[0].upper()) - ord('A')
+        if 0 <= val < n_options and val not in indices:
+            indices.append(val)
+    if not indices:
+        return None
+    return indices[0] if len(indices) == 1 else indices
+
+def _find_answer(body: str):
+    low = body.lower()
+    i = low.find("ans")
+    while i != -1:
+        if not (i and low[i - 1].isalpha()):  # "Ans" as a word, not "plans"
+            m = ANS_RE.match(body, i)
+            if m:
+                return m
+        i = low.find("ans", i + 1)
+    return None
+
+def lex_block(body: str) -> Tuple[str, List[str], Optional[str]]:
+    """
+    Splits a question body (without its "12." prefix) into (stem, options, answer text)
+    in a single scan. Option markers only count when they continue their sequence
+    (1,2,3,4 or A,B,C,D), so a "(2)" inside the stem is just text; numeric options win
+    over alphabetic ones, as long as there are at least two.
+    """
+    seqs = ([], [])  # accepted markers per style (_NUM, _ALPHA): (start, end)
+    ans = _find_answer(body)
+    ans_start, ans_end = ans.span() if ans else (len(body), len(body))
+    for m in MARKER_RE.finditer(body):
+        span = m.span()
+        if ans_start <= span[0] < ans_end:
+            continue  # the "(2)" of "Ans. (2)"
+        style, idx = _LABELS[m[m.lastindex]]
+        seq = seqs[style]
+        if idx == len(seq):
+            seq.append(span)
+        elif idx == 0 and len(seq) < 2:
+            seq[:] = [span]  # restart: an early "(1)" may have been stem text
+
+    num, alpha = seqs
+    markers = num if len(num) >= 2 else alpha if len(alpha) >= 2 else []
+
+    stem_end = min(markers[0][0], ans_start) if markers else ans_start
+    options = []
+    for i, (_, end) in enumerate(markers):
+        stop = markers[i + 1][0] if i + 1 < len(markers) else len(body)
+        if end <= ans_start < stop:
+            stop = ans_start  # "Ans." after the last option isn't part of it
+        options.append(_clean(body[end:stop]))
+
+    return _clean(body[:stem_end]), options, (ans.group("ans_val") if ans else None)
+
+def iter_key_entries(text: str, pos: int = 0) -> Iterator[re.Match]:
+    """KEY_ENTRY_RE matches in text, without the option values that look like entries."""
+    for m in KEY_ENTRY_RE.finditer(text, pos):
+        if m.group(3) is not None and ")" not in m.group(0):
+            if _OPTION_BEFORE_RE.search(text, max(0, m.start() - 8), m.start()):
+                continue
+            if _WORD_AFTER_RE.match(text, m.end()):
+                continue
+        yield m
+
+def count_key_entries(text: str, pos: int = 0) -> int:
+    return sum(1 for _ in iter_key_entries(text, pos))
+
+def scan_answer_key(text: str, key: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+    """
+    Reads an answer-key section in one scan into {question number: answer text}
+    ("3", "C", "1,3"). The first entry for a number wins. Pass key to add to an
+    existing index.
+    """
+    if key is None:
+        key = {}
+    for m in iter_key_entries(text):
+        key.setdefault(int(m.group(1)), m.group(2) or m.group(3))
+    return key
+
+def _key_section_start(page_text: str) -> Optional[Tuple[int, bool]]:
+    """
+    Where an answer key may start on this page, and whether that is certain:
+    (heading position, True) for a heading line followed by a key table;
+    (heading position, False) for a heading with too few entries after it, and
+    (0, False) for a page where entries outnumber question starts (a key table
+    without a heading). None for a page with no sign of a key.
+    """
+    m = ANSWER_KEY_HEADING_RE.search(page_text)
+    if m:
+        return m.start(), count_key_entries(page_text, m.end()) >= MIN_KEY_ENTRIES
+    entries = count_key_entries(page_text)
+    if entries >= MIN_KEY_ENTRIES and entries > 2 * len(QUESTION_START_RE.findall(page_text)):
+        return 0, False
+    return None
+
+def apply_answer_key(questions: List[Dict], key: Dict[int, str]) -> List[Dict]:
+    """
+    Sets correctIndex from the answer key, looked up by question number. An inline
+    "Ans." already found in the question is kept.
+    """
+    if not key:
+        return questions
+    for q in questions:
+        if q["correctIndex"] is None:
+            ans_text = key.get(q["number"])
+            if ans_text:
+                q["correctIndex"] = _answer_indices(ans_text, len(q["options"]))
+    return questions
+
+def _make_question(qnum: Optional[str], block: str, body: str) -> Dict:
+    stem, options, ans_text = lex_block(body)
+
+    if not options:
+        # No options found: create 4 blank slots (user can fill them)
+        options = ["", "", "", ""]
+
+    # Answer from an inline "Ans." marker; end-of-document keys are applied later (apply_answer_key)
+    correctIndex = _answer_indices(ans_text, len(options)) if ans_text else None
+
+    return {
+        "id": str(uuid.uuid4()),
+        "number": int(qnum) if qnum and qnum.isdigit() else None,
+        "text": stem or block,
+        "options": options,
+        "correctIndex": correctIndex,
+        "raw": block
+    }
+
+class IncrementalParser:
+    """
+    Parses a document fed one page at a time. Only the question that is still open
+    (the last one started) is carried over to the next page, so a question whose
+    options spill onto the following page is joined up, and every other question is
+    returned by feed() as soon as the next one starts.
+
+        p = IncrementalParser()
+        for text in page_texts:
+            questions.extend(p.feed(text))
+        questions.extend(p.close())
+
+    Pages are joined with a blank line, so the result is the same as
+    parse_questions_from_text("\n\n".join(page_texts)).
+
+    Once an answer-key section starts (see _key_section_start), the rest of the
+    document is read into answer_key instead of being parsed as questions; questions
+    already returned get their answers with apply_answer_key(questions, p.answer_key).
+    A page that only looks like a key (no heading followed by a key table) is held
+    back: it is the key if nothing but key-like pages follow it to the end of the
+    document, and parsed as questions as soon as a page that isn't key-like arrives.
+    """
+
+    PAGE_SEPARATOR = "\n\n"
+
+    def __init__(self):
+        self._carry = ""       # text of the open question, or everything so far if none started yet
+        self._started = False  # seen a question start yet?
+        self._fed = False
+        self._in_key = False   # inside the answer-key section
+        self._held = []        # (page text, key start) of key-like pages not yet decided
+        self.answer_key: Dict[int, str] = {}
+
+    def feed(self, page_text: str) -> List[Dict]:
+        """Adds the next page; returns the questions it closed."""
+        page_text = re.sub(r'\r\n?', '\n', page_text or "")
+        if not (self._fed or self._in_key or self._held):
+            self.answer_key = {}  # new document
+        if self._in_key:
+            scan_answer_key(page_text, self.answer_key)
+            return []
+        found = _key_section_start(page_text)
+        if found is None and self._held:
+            # the rest of a key table: entries and (almost) no question starts
+            entries = count_key_entries(page_text)
+            if entries and entries > 2 * len(QUESTION_START_RE.findall(page_text)):
+                found = (0, False)
+        if found is None:
+            # the held pages were questions after all
+            questions = []
+            for text, _ in self._held:
+                questions.extend(self._feed_questions(text))
+            self._held = []
+            return questions + self._feed_questions(page_text)
+        self._held.append((page_text, found[0]))
+        if found[1]:
+            return self._start_key()
+        return []
+
+    def _start_key(self) -> List[Dict]:
+        # the held pages are the answer key: questions end where it begins
+        (first, start), rest = self._held[0], self._held[1:]
+        self._held = []
+        questions = self._feed_questions(first[:start]) + self._flush()
+        self._in_key = True
+        scan_answer_key(first[start:], self.answer_key)
+        for text, _ in rest:
+            scan_answer_key(text, self.answer_key)
+        return questions
+
+    def _feed_questions(self, page_text: str) -> List[Dict]:
+        if self._fed:
+            page_text = self.PAGE_SEPARATOR + page_text
+        self._fed = True
+        t = self._carry + page_text
+
+        # the carried text was already scanned: only look for new starts in this page
+        starts = list(QUESTION_START_RE.finditer(t, len(self._carry)))
+        if self._started:
+            starts.insert(0, QUESTION_START_RE.match(t))
+        if not starts:
+            self._carry = t
+            return []
+        # text ahead of the first question (cover, instructions) is dropped
+        self._started = True
+
+        questions = []
+        for m, nxt in zip(starts, starts[1:]):
+            questions.append(_make_question(m.group(1), t[m.start():nxt.start()].strip(), t[m.end():nxt.start()]))
+        self._carry = t[starts[-1].start():]
+        return questions
+
+    def _flush(self) -> List[Dict]:
+        t, started = self._carry, self._started
+        self._carry, self._started = "", False
+        if started:
+            m = QUESTION_START_RE.match(t)
+            return [_make_question(m.group(1), t.strip(), t[m.end():])]
+        # fallback: no numbered questions at all, split by double newlines into paragraphs
+        parts = [p.strip() for p in re.split(r'\n\s*\n', t) if p.strip()]
+        return [_make_question(None, p, p) for p in parts]
+
+    def close(self) -> List[Dict]:
+        """
+        Ends the document; returns the last question (or the fallback paragraphs).
+        answer_key stays available until the next feed().
+        """
+        if self._held and any(count_key_entries(text, start) for text, start in self._held):
+            questions = self._start_key()  # key-like pages up to the end: the key
+        else:
+            questions = []
+            for text, _ in self._held:  # a heading with no key after it
+                questions.extend(self._feed_questions(text))
+            self._held = []
+            questions.extend([] if self._in_key else self._flush())
+        self._carry, self._started, self._fed, self._in_key = "", False, False, False
+        return questions
+
+def iter_questions(page_texts: Iterable[str]) -> Iterator[Dict]:
+    """
+    Questions from an iterable of page texts, yielded as soon as each one is complete.
+    Answers from an end-of-document key can't be known that early: use parse_pages
+    for those.
+    """
+    p = IncrementalParser()
+    for text in page_texts:
+        yield from p.feed(text)
+    yield from p.close()
+
+def parse_pages(page_texts: Iterable[str]) -> List[Dict]:
+    """All questions from an iterable of page texts, with the answer key applied."""
+    p = IncrementalParser()
+    questions = []
+    for text in page_texts:
+        questions.extend(p.feed(text))
+    questions.extend(p.close())
+    return apply_answer_key(questions, p.answer_key)
 
 def parse_questions_from_text(full_text: str) -> List[Dict]:
     """
     Parse questions from the full PDF text.
     Returns list of dicts:
-      { id, number, text, options: [.. up to 4], correctIndex: int or list or None, raw_block, page_num_hint (optional) }
+      { id, number, text, options: [.. up to 4], correctIndex: int or list or None, raw }
     Notes:
-     - handles numeric (1)-(4) option markers and A/B style
+     - text is the question stem, without its number and options
+     - handles numeric (1)-(4) option markers and A/B style, inline or one per line
      - if no options found, creates 4 blank slots for editing
      - if answer found like 'Ans. (2)' sets correctIndex to 0-based int; if multiple answers, stores list of indices
+     - otherwise the answer comes from an "ANSWER KEY" table at the end, matched by question number
     """
     if not full_text:
         return []
-
-    # Normalize line endings
-    t = re.sub(r'\r\n?', '\n', full_text)
-    # We will find question start indices
-    starts = [m for m in QUESTION_START_RE.finditer(t)]
-    q_blocks = []
-    if not starts:
-        # fallback: split by double newlines into paragraphs
-        parts = [p.strip() for p in re.split(r'\n\s*\n', t) if p.strip()]
-        for p in parts:
-            q_blocks.append((None, p))
-    else:
-        for i, m in enumerate(starts):
-            qnum = m.group(1)
-            start_idx = m.start()
-            end_idx = starts[i+1].start() if i+1 < len(starts) else len(t)
-            block = t[start_idx:end_idx].strip()
-            q_blocks.append((qnum, block))
-
-    questions = []
-    for qnum, block in q_blocks:
-        raw = block
-
-        # Try to find inline numeric options first (common JEE style)
-        inline_num = INLINE_NUMERIC_OPTIONS_RE.findall(block)
-        options = []
-        if inline_num and len(inline_num) >= 2:
-            # inline_num returns list of tuples (num, text)
-            # We need to order by the numeric label (1..)
-            # But the regex finds them in order; still safe to sort by int(label)
-            items = sorted(((int(lbl), txt.strip()) for lbl, txt in inline_num), key=lambda x: x[0])
-            options = [txt for _, txt in items]
-        else:
-            # Try line-based numeric options
-            line_opts = LINE_OPTION_RE.findall(block)
-            if line_opts and len(line_opts) >= 2:
-                items = sorted(((int(lbl), txt.strip()) for lbl, txt in line_opts), key=lambda x: x[0])
-                options = [txt for _, txt in items]
-
-        # If still no numeric options, try alpha style inline or line-based
-        if not options:
-            inline_alpha = INLINE_ALPHA_OPTIONS_RE.findall(block)
-            if inline_alpha and len(inline_alpha) >= 2:
-                items = sorted(((lbl.upper(), txt.strip()) for lbl, txt in inline_alpha), key=lambda x: x[0])
-                options = [txt for _, txt in items]
-            else:
-                line_alpha = LINE_ALPHA_OPTION_RE.findall(block)
-                if line_alpha and len(line_alpha) >= 2:
-                    # sort by A,B,C...
-                    items = sorted(((lbl.upper(), txt.strip()) for lbl, txt in line_alpha), key=lambda x: x[0])
-                    options = [txt for _, txt in items]
-
-        # If options found, trim/normalize to at most 4
-        if options:
-            # Some options might include trailing 'Ans.' accidentally — strip 'Ans' fragments
-            cleaned = []
-            for opt in options:
-                # remove trailing 'Ans' phrases that might get included
-                cleaned_opt = re.sub(r'(?i)\bAns\b.*$', '', opt).strip()
-                cleaned.append(cleaned_opt)
-            options = cleaned[:4]
-        else:
-            # No options found: create 4 blank slots (user can fill them)
-            options = ["", "", "", ""]
-
-        # Find answer (Ans.) in block
-        correctIndex = None
-        ans_match = ANS_RE.search(block)
-        if ans_match:
-            ans_text = ans_match.group(1).strip()
-            # Ans can be "2" or "2,4" or "A" or "A,C"
-            # Normalize: split by comma or space
-            parts = re.split(r'[,\s]+', ans_text)
-            indices = []
-            for p in parts:
-                if not p:
-                    continue
-                if p.isdigit():
-                    val = int(p) - 1
-                    if 0 <= val < len(options):
-                        indices.append(val)
-                else:
-                    # letter
-                    ch = p[0].upper()
-                    if ch >= 'A' and ch <= 'D':
-                        idx = ord(ch) - ord('A')
-                        if 0 <= idx < len(options):
-                            indices.append(idx)
-            if indices:
-                # if multiple answers, store list; if single, store single int
-                correctIndex = indices[0] if len(indices) == 1 else indices
-
-        # Also try to find an answer noted elsewhere: sometimes at file end. We'll not parse end-of-file answers here.
-        # Build question dict
-        qdict = {
-            "id": str(uuid.uuid4()),
-            "number": int(qnum) if qnum and qnum.isdigit() else None,
-            "text": block,
-            "options": options,
-            "correctIndex": correctIndex,
-            "raw": raw
-        }
-        questions.append(qdict)
-
-    return questions
+    return parse_pages([full_text])
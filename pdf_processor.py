@@ -1,14 +1,44 @@
-import pdfplumber
 import pytesseract
 from PIL import Image
 import re
 import io
+import os
+import shutil
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from page_render import PageRenderer
+from spatial import assign_images
+from pdf_session import open_session
+from image_store import store_image
+import extract_cache
+import page_triage
 
-# Set Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Tesseract binary: TESSERACT_CMD env var, else PATH, else the default Windows install
+TESSERACT_CMD = os.environ.get("TESSERACT_CMD")
+WINDOWS_TESSERACT = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+OCR_WORKERS = os.cpu_count() or 1  # tesseract processes running at once
+OCR_DPI = 300                      # render resolution for scanned pages
+OCR_WINDOW = 2                     # scanned pages rendered ahead per worker (~26 MB each at OCR_DPI)
+PREVIEW_DPI = 72                   # page previews (page_previews)
+PREVIEW_DIR = "images"
+PREVIEW_KIND = "previews"          # their own bundle, apart from the figure crops
+PREVIEW_VERSION = 2                # bump when previews change, invalidates cached ones
 
 QUESTION_PATTERN = re.compile(r'^\s*(Q?\s*\d+[\.\)])', re.IGNORECASE)
 
+def find_tesseract():
+    """Path of the tesseract binary, or None if it isn't installed."""
+    if TESSERACT_CMD:
+        return TESSERACT_CMD
+    found = shutil.which("tesseract")
+    if found:
+        return found
+    if os.path.exists(WINDOWS_TESSERACT):
+        return WINDOWS_TESSERACT
+    return None
+
 def merge_bbox(bboxes):
     """Merge multiple bounding boxes into one bounding box (x0,y0,x1,y1)."""
     x0 = min(b[0] for b in bboxes)
@@ -23,85 +53,248 @@ def bbox_intersects(b1, b2):
     a0, b0, a1, b1_ = b2
     return not (x1 < a0 or x0 > a1 or y1 < b0 or y0 > b1_)
 
-def crop_image_from_page(page, bbox):
-    """Crop a region of the PDF page into a PIL image."""
+def crop_image_from_page(page, bbox, renderer=None):
+    """Crop a region of the PDF page into a PIL image.
+    Pass a PageRenderer to reuse one page raster for every crop."""
     try:
-        clipped = page.within_bbox(bbox)
-        img = clipped.to_image(resolution=200).original
-        return img
+        if renderer is None:
+            renderer = PageRenderer(page)
+        return renderer.crop(bbox, 200)
     except:
         return None
 
-def extract_questions_with_images(pdf_path):
+def build_question_blocks(words):
+    """Group words (dicts with text, x0, top, x1, bottom) into question blocks."""
+    question_blocks = []
+    current_block = {"lines": [], "bboxes": []}
+
+    # Build question blocks from detected text lines
+    for w in words:
+        text = w["text"]
+        bbox = (w["x0"], w["top"], w["x1"], w["bottom"])
+
+        # If this line starts a new question → close previous block
+        if QUESTION_PATTERN.match(text):
+            if current_block["lines"]:
+                question_blocks.append(current_block)
+            current_block = {"lines": [], "bboxes": []}
+
+        current_block["lines"].append(text)
+        current_block["bboxes"].append(bbox)
+
+    # Add last block
+    if current_block["lines"]:
+        question_blocks.append(current_block)
+
+    return question_blocks
+
+def make_question(q_text, figures):
+    """Question dict in the shape extract_questions_with_images returns."""
+    # MCQ option detection
+    options = []
+    opt_matches = re.findall(
+        r'\(([A-D])\)\s*([^\(]+?)(?=\([A-D]\)|$)',
+        q_text,
+        re.IGNORECASE
+    )
+
+    if opt_matches:
+        options = [o[1].strip() for o in opt_matches]
+
+    q_type = "MCQ" if options else "NUMERIC"
+
+    return {
+        "question": q_text.strip(),
+        "options": options,
+        "type": q_type,
+        "figures": figures
+    }
+
+def ocr_words(image, scale):
+    """
+    Run tesseract on a page image and return its words in PDF points
+    (image pixels / scale), same keys as page.extract_words().
+    """
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        if not text:
+            continue
+        left, top = data["left"][i], data["top"][i]
+        words.append({
+            "text": text,
+            "x0": left / scale,
+            "top": top / scale,
+            "x1": (left + data["width"][i]) / scale,
+            "bottom": (top + data["height"][i]) / scale,
+        })
+    return words
+
+def _ocr_page(image, scale):
+    # runs on a pool thread; tesseract itself is a separate process,
+    # so threads are enough to keep several of them busy
+    results = []
+    for qb in build_question_blocks(ocr_words(image, scale)):
+        x0, top, x1, bottom = merge_bbox(qb["bboxes"])
+        # a scanned page has no separate figure objects: keep the block's own region
+        region = image.crop((int(x0 * scale), int(top * scale), int(x1 * scale) + 1, int(bottom * scale) + 1))
+        results.append(make_question(" ".join(qb["lines"]), [region]))
+    return results
+
+def _text_page(doc, page_number):
+    page = doc.page(page_number)
+    words = doc.words(page_number, x_tolerance=3, y_tolerance=3)
+    images = doc.images(page_number)  # all image objects in the page
+    renderer = doc.renderer(page_number)  # rendered on first crop only
+
+    question_blocks = build_question_blocks(words)
+
+    # Match images to each question block
+    img_bboxes = [(img["x0"], img["y0"], img["x1"], img["y1"]) for img in images]
+    block_hits = assign_images([merge_bbox(qb["bboxes"]) for qb in question_blocks], img_bboxes)
+
+    results = []
+    for qb, hits in zip(question_blocks, block_hits):
+        q_text = " ".join(qb["lines"])
+
+        # Crop only images that overlap with question
+        figures = []
+        for i in hits:
+            cropped = crop_image_from_page(page, img_bboxes[i], renderer)
+            if cropped:
+                figures.append(cropped)
+
+        results.append(make_question(q_text, figures))
+    return results
+
+def _fallback_page(doc, page_number, error):
+    # a scanned page whose render or OCR failed: keep what its text layer has
+    warnings.warn(f"OCR failed on page {page_number} ({error}); using its text layer", RuntimeWarning)
+    try:
+        return _text_page(doc, page_number)
+    except Exception as e:
+        warnings.warn(f"page {page_number} skipped ({e})", RuntimeWarning)
+        return []
+
+def extract_questions_with_images(pdf_path, ocr=True, ocr_workers=None, triage=True):
     """
     Extract:
     - Full question text (multi-line)
     - Options (A–D)
     - Numerical type (no options)
     - Cropped images belonging to each question
+
+    Pages are labelled by page_triage first (triage=True): scanned pages go
+    through tesseract when ocr is True and tesseract is installed, with
+    ocr_workers tesseract processes in parallel (default OCR_WORKERS) and at
+    most OCR_WINDOW renders per worker waiting for them; blank, cover,
+    answer-key and figure-only pages are skipped. A scanned page that can't be
+    rendered or read falls back to its text layer, with a warning.
+    Results keep page order.
     """
 
-    results = []
+    tesseract = find_tesseract() if ocr else None
+    if tesseract:
+        pytesseract.pytesseract.tesseract_cmd = tesseract
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            words = page.extract_words(x_tolerance=3, y_tolerance=3)
-            images = page.images  # all image objects in the page
+    workers = ocr_workers or OCR_WORKERS
+    page_results = []  # per page: list of questions, or (page number, future) for OCR pages
+    inflight = deque()  # indices in page_results of OCR pages not collected yet, oldest first
 
-            question_blocks = []
-            current_block = {"lines": [], "bboxes": []}
+    def collect(i):
+        n, future = page_results[i]
+        try:
+            page_results[i] = future.result()
+        except Exception as e:
+            page_results[i] = _fallback_page(doc, n, e)
 
-            # Build question blocks from detected text lines
-            for w in words:
-                text = w["text"]
-                bbox = (w["x0"], w["top"], w["x1"], w["bottom"])
+    with open_session(pdf_path) as doc, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        for n in doc.page_numbers:
+            if triage:
+                label = doc.label(n)
+            elif len(doc.chars(n)) >= page_triage.MIN_TEXT_CHARS:
+                label = page_triage.TEXT_QUESTION
+            else:
+                label = page_triage.SCANNED
+            if label not in (page_triage.TEXT_QUESTION, page_triage.SCANNED):
+                continue
+            if label == page_triage.TEXT_QUESTION or not tesseract:
+                page_results.append(_text_page(doc, n))
+                continue
+            # rendering touches the pdf, so it stays on this thread; only OCR is parallel.
+            # Wait for the oldest page before rendering more than the window holds.
+            while len(inflight) >= workers * OCR_WINDOW:
+                collect(inflight.popleft())
+            try:
+                image = doc.render(n, OCR_DPI)
+            except Exception as e:
+                page_results.append(_fallback_page(doc, n, e))
+                continue
+            inflight.append(len(page_results))
+            page_results.append((n, pool.submit(_ocr_page, image, image.size[0] / doc.page(n).width)))
+        while inflight:
+            collect(inflight.popleft())
 
-                # If this line starts a new question → close previous block
-                if QUESTION_PATTERN.match(text):
-                    if current_block["lines"]:
-                        question_blocks.append(current_block)
-                    current_block = {"lines": [], "bboxes": []}
+        results = []
+        for r in page_results:
+            results.extend(r)
 
-                current_block["lines"].append(text)
-                current_block["bboxes"].append(bbox)
+    return results
 
-            # Add last block
-            if current_block["lines"]:
-                question_blocks.append(current_block)
+def _render_previews(pdf_path):
+    # (one {page_num, images: [ref]} per page with figures, whether every render worked)
+    pages, complete = [], True
+    with open_session(pdf_path) as doc:
+        for n in doc.page_numbers:
+            if doc.images(n):
+                try:
+                    ref = store_image(doc.render(n, PREVIEW_DPI), PREVIEW_DIR, pdf_path, PREVIEW_KIND)
+                except Exception:
+                    complete = False  # no renderer available: no preview
+                    continue
+                pages.append({"page_num": n, "images": [ref]})
+    return pages, complete
+
+def page_previews(pdf_path):
+    """
+    { page_num (1-based): image ref } of PREVIEW_DPI renders of the pages that carry
+    figures. Cached by the PDF's content hash (extract_cache), so a PDF is rendered
+    once rather than on every load; a run where rendering failed isn't cached.
+    The cache entry is also what keeps the previews from image_store's GC.
+    """
+    key = extract_cache.cache_key(pdf_path, "page_previews", PREVIEW_VERSION,
+                                  {"dpi": PREVIEW_DPI, "store": PREVIEW_DIR, "kind": PREVIEW_KIND})
+    pages = extract_cache.load(key)
+    if pages is None:
+        pages, complete = _render_previews(pdf_path)
+        if complete:
+            extract_cache.store(key, pages)
+    return {p["page_num"]: p["images"][0] for p in pages}
 
-            # Match images to each question block
-            for qb in question_blocks:
-                q_bbox = merge_bbox(qb["bboxes"])
-                q_text = " ".join(qb["lines"])
-
-                # Crop only images that overlap with question
-                figures = []
-                for img in images:
-                    img_bbox = (img["x0"], img["y0"], img["x1"], img["y1"])
-
-                    if bbox_intersects(q_bbox, img_bbox):
-                        cropped = crop_image_from_page(page, img_bbox)
-                        if cropped:
-                            figures.append(cropped)
-
-                # MCQ option detection
-                options = []
-                opt_matches = re.findall(
-                    r'\(([A-D])\)\s*([^\(]+?)(?=\([A-D]\)|$)',
-                    q_text,
-                    re.IGNORECASE
-                )
-
-                if opt_matches:
-                    options = [o[1].strip() for o in opt_matches]
-
-                q_type = "MCQ" if options else "NUMERIC"
-
-                results.append({
-                    "question": q_text.strip(),
-                    "options": options,
-                    "type": q_type,
-                    "figures": figures
-                })
+def extract_pages_with_images(pdf_path, ocr_on_image_pages=True):
+    """
+    One dict per page: { page_num (1-based), text, page_image }. page_image is the
+    image ref (in the PDF's image bundle) of a PREVIEW_DPI render for pages that
+    carry figures (see page_previews), else None.
+    With ocr_on_image_pages, scanned pages get their text from tesseract.
+    Shares the open_session of a caller that already has the PDF open.
+    """
+    tesseract = find_tesseract() if ocr_on_image_pages else None
+    if tesseract:
+        pytesseract.pytesseract.tesseract_cmd = tesseract
 
-    return results
+    pages = []
+    with open_session(pdf_path) as doc:
+        previews = page_previews(pdf_path)
+        for n in doc.page_numbers:
+            text = doc.text(n)
+            page_image = previews.get(n)
+            if tesseract and doc.images(n) and doc.label(n) == page_triage.SCANNED:
+                try:
+                    text = pytesseract.image_to_string(doc.render(n, OCR_DPI))
+                except Exception:
+                    pass
+            pages.append({"page_num": n, "text": text, "page_image": page_image})
+    return pages
@@ -0,0 +1,235 @@
+# pdf_session.py
+# One open PDF shared by every extractor. The file is opened once and each page is
+# parsed once; every per-page artifact (text, chars, words, images, triage label, renders) is
+# computed on first use and memoized, within a memory budget: the least recently
+# used artifacts are dropped when it is exceeded and recomputed if asked for again.
+#
+#     with open_session(pdf_path) as doc:
+#         for n in doc.page_numbers:
+#             doc.text(n), doc.chars(n), doc.images(n), doc.renderer(n).crop(bbox, 200)
+#
+# Sessions are shared: open_session on a path that is already open in this
+# process returns the same session, so main.load_pdf, pdf_processor and the
+# triage pass all work off one parse of the file.
+import io
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pdfplumber
+
+from page_render import PageRenderer
+
+MEMORY_BUDGET = 256 * 1024 * 1024  # bytes of memoized artifacts per session
+
+# rough sizes for the budget: a pdfplumber object dict is ~20 keys
+OBJECT_BYTES = 1500
+WORD_BYTES = 600
+SMALL_BYTES = 100
+
+_sessions = {}  # real path -> open PdfSession
+_sessions_lock = threading.Lock()
+
+
+class _SessionRenderer(PageRenderer):
+    # crops as in PageRenderer, but the full-page raster lives in the session
+    # so it counts against (and is evicted by) the memory budget
+    def __init__(self, session, page_number):
+        super().__init__(session.page(page_number))
+        self._session = session
+        self._page_number = page_number
+
+    def render(self, resolution):
+        return self._session.render(self._page_number, resolution)
+
+
+class PdfSession:
+    """
+    A PDF opened once, with lazily computed, memoized per-page artifacts.
+    Page numbers are 1-based, like pdfplumber's page.page_number.
+    """
+
+    def __init__(self, pdf_path, memory_budget=MEMORY_BUDGET):
+        self.path = pdf_path
+        self.memory_budget = memory_budget
+        self._data = None
+        self._pdf = None
+        self._reader = None
+        self._artifacts = OrderedDict()  # (kind, page_number, args) -> (value, size), LRU first
+        self._used = 0
+        self._lock = threading.RLock()   # pdfplumber pages aren't thread-safe
+        self._refs = 0
+
+    # --- document ---------------------------------------------------------------
+    @property
+    def data(self):
+        """The file's bytes, read once, for the PyPDF2 reader."""
+        with self._lock:
+            if self._data is None:
+                with open(self.path, "rb") as f:
+                    self._data = f.read()
+            return self._data
+
+    @property
+    def pdf(self):
+        with self._lock:
+            if self._pdf is None:
+                # from the path, not the bytes: pdfplumber renders a named file as
+                # "file.pdf[n]", one page, but a nameless stream by loading every
+                # page into ImageMagick and keeping one
+                self._pdf = pdfplumber.open(self.path)
+            return self._pdf
+
+    @property
+    def reader(self):
+        """A PyPDF2 reader over the same bytes (for stream_text)."""
+        with self._lock:
+            if self._reader is None:
+                import PyPDF2
+                self._reader = PyPDF2.PdfReader(io.BytesIO(self.data))
+            return self._reader
+
+    @property
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    @property
+    def page_numbers(self):
+        return range(1, self.page_count + 1)
+
+    def page(self, page_number):
+        return self.pdf.pages[page_number - 1]
+
+    def close(self):
+        with self._lock:
+            self._artifacts.clear()
+            self._used = 0
+            if self._pdf is not None:
+                self._pdf.close()
+                self._pdf = None
+            self._reader = None
+            self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- memo -------------------------------------------------------------------
+    def _memo(self, kind, page_number, args, compute, sizeof):
+        key = (kind, page_number, args)
+        with self._lock:
+            hit = self._artifacts.get(key)
+            if hit is not None:
+                self._artifacts.move_to_end(key)
+                return hit[0]
+            value = compute()
+            size = sizeof(value)
+            self._artifacts[key] = (value, size)
+            self._used += size
+            self._evict(page_number)
+            return value
+
+    def _evict(self, current_page):
+        # least recently used first; the page being worked on is never evicted,
+        # even when it alone is over budget
+        if self._used <= self.memory_budget:
+            return
+        for key in list(self._artifacts):
+            if self._used <= self.memory_budget:
+                break
+            kind, page_number, _ = key
+            if page_number == current_page:
+                continue
+            _, size = self._artifacts.pop(key)
+            self._used -= size
+            if kind == "objects":
+                # drop pdfplumber's parsed objects and layout for the page
+                self.page(page_number).flush_cache()
+
+    def _objects(self, page_number):
+        # pdfplumber parses a page once and keeps the objects on the Page: this
+        # entry only accounts for them, and flushes them when it is evicted
+        page = self.page(page_number)
+        return self._memo("objects", page_number, None, lambda: page.objects,
+                          lambda objs: OBJECT_BYTES * sum(len(v) for v in objs.values()))
+
+    @property
+    def memory_used(self):
+        """Estimated bytes held by memoized artifacts."""
+        return self._used
+
+    # --- artifacts --------------------------------------------------------------
+    def chars(self, page_number):
+        return self._objects(page_number).get("char", [])
+
+    def images(self, page_number):
+        return self._objects(page_number).get("image", [])
+
+    def text(self, page_number):
+        """page.extract_text(), "" for pages without text."""
+        self._objects(page_number)
+        return self._memo("text", page_number, None, lambda: self.page(page_number).extract_text() or "",
+                          sys.getsizeof)
+
+    def stream_text(self, page_number):
+        """
+        PyPDF2's extract_text(): text in content-stream order, which keeps the
+        columns of a two-column paper apart where extract_text() interleaves them.
+        """
+        def compute():
+            try:
+                return self.reader.pages[page_number - 1].extract_text() or ""
+            except Exception:
+                return ""
+        return self._memo("stream_text", page_number, None, compute, sys.getsizeof)
+
+    def words(self, page_number, **kwargs):
+        """page.extract_words(**kwargs), memoized per set of arguments."""
+        self._objects(page_number)
+        return self._memo("words", page_number, tuple(sorted(kwargs.items())),
+                          lambda: self.page(page_number).extract_words(**kwargs),
+                          lambda words: WORD_BYTES * len(words))
+
+    def label(self, page_number):
+        """page_triage label of the page."""
+        import page_triage
+        self._objects(page_number)
+        return self._memo("label", page_number, None,
+                          lambda: page_triage.classify_page(self.page(page_number)), lambda _: SMALL_BYTES)
+
+    def render(self, page_number, resolution):
+        """The full page rasterised at resolution (PIL image)."""
+        return self._memo("render", page_number, resolution,
+                          lambda: self.page(page_number).to_image(resolution=resolution).original,
+                          lambda im: im.size[0] * im.size[1] * len(im.getbands()))
+
+    def renderer(self, page_number):
+        """A PageRenderer for the page whose raster is shared through render()."""
+        return self._memo("renderer", page_number, None,
+                          lambda: _SessionRenderer(self, page_number), lambda _: SMALL_BYTES)
+
+
+@contextmanager
+def open_session(pdf_path, memory_budget=MEMORY_BUDGET):
+    """
+    The open session for pdf_path, or a new one. It is closed when the last
+    open_session block using it exits.
+    """
+    key = os.path.realpath(pdf_path)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = PdfSession(pdf_path, memory_budget)
+        session._refs += 1
+    try:
+        yield session
+    finally:
+        with _sessions_lock:
+            session._refs -= 1
+            if session._refs == 0:
+                del _sessions[key]
+                session.close()
@@ -1,12 +1,18 @@
 import os
 import re
-import pdfplumber
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import tkinter as tk
 from tkinter import messagebox
+from image_bundle import open_image
+from image_store import store_image
+from pdf_session import open_session
+from spatial import assign_images
+from line_grouping import group_chars, LINE_TOLERANCE
+import page_triage
 
 PDF_PATH = PDF_PATH = r"E:\pdf_quiz_windows\1.pdf"     # your uploaded PDF
 TEMP_DIR = "question_images"
+RESOLUTION = 200
 os.makedirs(TEMP_DIR, exist_ok=True)
 
 QUESTION_PATTERN = re.compile(r'^\s*(\d+)[\.\)]')  # "1." or "1)"
@@ -20,26 +26,9 @@ def is_bold(fontname):
     return any(h in fontname for h in BOLD_HINTS)
 
 
-def group_lines(page):
-    chars = page.chars
-    if not chars:
-        return []
-
-    lines_map = {}
-    for ch in chars:
-        key = int(round(ch["top"]))
-        lines_map.setdefault(key, []).append(ch)
-
-    lines = []
-    for k in sorted(lines_map.keys()):
-        row = sorted(lines_map[k], key=lambda c: c["x0"])
-        text = "".join(c["text"] for c in row)
-        x0 = min(c["x0"] for c in row)
-        x1 = max(c["x1"] for c in row)
-        top = min(c["top"] for c in row)
-        bottom = max(c["bottom"] for c in row)
-        lines.append({"text": text, "chars": row, "bbox": (x0, top, x1, bottom)})
-    return lines
+def group_lines(page, y_tolerance=LINE_TOLERANCE):
+    """The page's text lines (line_grouping.group_chars): chars whose tops are within y_tolerance points chain."""
+    return group_chars(page.chars, y_tolerance)
 
 
 def merge_boxes(bboxes):
@@ -55,14 +44,18 @@ def intersects(a, b):
     return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
 
 
-def extract_questions(pdf_path):
-    questions = []
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
-            lines = group_lines(page)
+def iter_questions(pdf_path, triage=True, y_tolerance=LINE_TOLERANCE):
+    """Yields each question as soon as its page has been processed.
+    With triage, pages that page_triage doesn't label text-question are skipped.
+    y_tolerance: see group_lines."""
+    with open_session(pdf_path) as doc:
+        for page_index in doc.page_numbers:
+            if triage and doc.label(page_index) != page_triage.TEXT_QUESTION:
+                continue
+            lines = group_lines(doc.page(page_index), y_tolerance)
             if not lines:
                 continue
+            renderer = doc.renderer(page_index)
 
             starts = []
             for i, ln in enumerate(lines):
@@ -84,11 +77,15 @@ def extract_questions(pdf_path):
             else:
                 indices = [idx for idx, _, _ in starts]
 
+            ends = indices[1:] + [len(lines)]
+            block_bboxes = [merge_boxes([l["bbox"] for l in lines[s:e]]) for s, e in zip(indices, ends)]
+            image_bboxes = [(img["x0"], img["top"], img["x1"], img["bottom"]) for img in doc.images(page_index)]
+            hits = assign_images(block_bboxes, image_bboxes)
+
             for s_i, start_line in enumerate(indices):
-                end_line = indices[s_i + 1] if s_i + 1 < len(indices) else len(lines)
+                end_line = ends[s_i]
                 block_lines = lines[start_line:end_line]
                 block_text = "\n".join(l["text"] for l in block_lines)
-                block_bbox = merge_boxes([l["bbox"] for l in block_lines])
 
                 qnum = None
                 m = QUESTION_PATTERN.match(block_lines[0]["text"])
@@ -96,25 +93,22 @@ def extract_questions(pdf_path):
                     qnum = int(m.group(1))
 
                 imgs = []
-                for idx_img, img in enumerate(page.images):
-                    ib = (img["x0"], img["top"], img["x1"], img["bottom"])
-                    if intersects(block_bbox, ib):
-                        try:
-                            cropped = page.within_bbox(ib).to_image(resolution=200).original
-                            fname = f"q{qnum}_img{idx_img}.png"
-                            fpath = os.path.join(TEMP_DIR, fname)
-                            cropped.save(fpath)
-                            imgs.append(fpath)
-                        except:
-                            pass
-
-                questions.append({
+                for idx_img in hits[s_i]:
+                    try:
+                        cropped = renderer.crop(image_bboxes[idx_img], RESOLUTION)
+                        imgs.append(store_image(cropped, TEMP_DIR, pdf_path))
+                    except:
+                        pass
+
+                yield {
                     "number": qnum,
                     "text": block_text,
                     "images": imgs
-                })
+                }
+
 
-    return questions
+def extract_questions(pdf_path, triage=True, y_tolerance=LINE_TOLERANCE):
+    return list(iter_questions(pdf_path, triage, y_tolerance))
 
 
 #########################################
@@ -165,7 +159,7 @@ class QuizApp:
         if q["images"]:
             img_path = q["images"][0]
             try:
-                im = Image.open(img_path)
+                im = open_image(img_path)
                 im.thumbnail((900, 420))
                 self.tk_img = ImageTk.PhotoImage(im)
                 self.img_label.config(image=self.tk_img)
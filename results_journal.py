@@ -0,0 +1,233 @@
+# results_journal.py
+# Quiz results as an append-only log (one JSON line per result) in front of a
+# compacted snapshot (results.json, a JSON list as before). Saving a result is one
+# appended line; the log is folded into the snapshot once it grows past
+# COMPACT_LOG_BYTES. Per-quiz aggregates (attempts, mean, median, best, score
+# histogram) are kept next to the snapshot and brought up to date from the log
+# tail, so asking for them never rescans the whole history.
+#
+# Several processes can share a journal: appends hold a lock on the log,
+# compaction and snapshot reads a lock on the snapshot (atomic_io.locked).
+import json
+import os
+
+from atomic_io import CorruptFileError, dump_json, locked, read_json, replace_file
+
+COMPACT_LOG_BYTES = 256 * 1024  # compact once the log is this big
+STATS_VERSION = 1
+
+
+def _read_list(path):
+    return read_json(path, [])
+
+
+def _read_lines(path, start=0):
+    """Records from a JSON-lines file starting at byte offset start, and the offset after
+    the last complete line (a line cut short by a crash is left for later). Lines that
+    don't decode (a torn append that was ended by the next one) are skipped."""
+    if not os.path.exists(path):
+        return [], start
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        if line.strip():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, start + end
+
+
+def _merged(records, segment):
+    # a crash after writing the snapshot but before removing the .compacting
+    # segment leaves the segment already at the snapshot's tail
+    return bool(segment) and records[-len(segment):] == segment
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+# --- aggregates --------------------------------------------------------------------
+def _add(stats, record):
+    agg = stats.get(record["quiz_id"])
+    if agg is None:
+        agg = stats[record["quiz_id"]] = {"quiz_title": record.get("quiz_title"), "attempts": 0,
+                                          "sum": 0, "best": None, "histogram": {}}
+    score = record["score"]
+    agg["quiz_title"] = record.get("quiz_title", agg["quiz_title"])
+    agg["attempts"] += 1
+    agg["sum"] += score
+    agg["best"] = score if agg["best"] is None else max(agg["best"], score)
+    agg["histogram"][score] = agg["histogram"].get(score, 0) + 1
+
+
+def _median(histogram, n):
+    # middle value(s) from the counts: O(distinct scores), not O(attempts)
+    lo, hi = (n - 1) // 2, n // 2
+    seen, lo_val = 0, None
+    for score in sorted(histogram):
+        seen += histogram[score]
+        if lo_val is None and seen > lo:
+            lo_val = score
+        if seen > hi:
+            return (lo_val + score) / 2
+    return None
+
+
+def _summary(quiz_id, agg):
+    n = agg["attempts"]
+    return {
+        "quiz_id": quiz_id,
+        "quiz_title": agg["quiz_title"],
+        "attempts": n,
+        "mean": agg["sum"] / n if n else None,
+        "median": _median(agg["histogram"], n) if n else None,
+        "best": agg["best"],
+        "histogram": dict(sorted(agg["histogram"].items())),
+    }
+
+
+def _stats_to_json(stats):
+    return {qid: dict(agg, histogram=[[s, c] for s, c in agg["histogram"].items()]) for qid, agg in stats.items()}
+
+
+def _stats_from_json(data):
+    return {qid: dict(agg, histogram={s: c for s, c in agg["histogram"]}) for qid, agg in data.items()}
+
+
+class ResultsJournal:
+    """
+    snapshot_path: compacted results (JSON list, the results.json format)
+    log_path:      appended JSON lines, default snapshot_path + ".log"
+    stats_path:    per-quiz aggregates of the snapshot, default snapshot_path + ".stats"
+    """
+
+    def __init__(self, snapshot_path, log_path=None, stats_path=None, compact_log_bytes=COMPACT_LOG_BYTES):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or snapshot_path + ".log"
+        self.stats_path = stats_path or snapshot_path + ".stats"
+        self.compacting_path = self.log_path + ".compacting"
+        self.compact_log_bytes = compact_log_bytes
+        self._stats = None    # quiz_id -> aggregate, up to _log_pos in the log
+        self._snapshot_sig = None
+        self._log_pos = 0
+
+    # --- writes ---------------------------------------------------------------------
+    def append(self, record):
+        """Adds one result: a single appended line. Compacts when the log is big enough."""
+        self.extend([record])
+
+    def extend(self, records):
+        """Appends records in one write under the log lock."""
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        if not data:
+            return
+        with locked(self.log_path):
+            with open(self.log_path, "a+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data  # end a line cut short by a crash, don't continue it
+                f.write(data)
+                f.flush()
+                size = f.tell()
+        if size >= self.compact_log_bytes:
+            self.compact()
+
+    def compact(self):
+        """Folds the log into the snapshot and resets it."""
+        with locked(self.snapshot_path):
+            self._finish_compaction()
+            with locked(self.log_path):
+                if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+                    return
+                # new appends go to a fresh log while this segment is merged;
+                # the lock keeps a writer from appending to the renamed file
+                replace_file(self.log_path, self.compacting_path)
+            self._finish_compaction()
+
+    def _finish_compaction(self):
+        # merges a pending .compacting segment; also finishes one left by a crash.
+        # Called with the snapshot lock held.
+        if not os.path.exists(self.compacting_path):
+            return
+        segment, _ = _read_lines(self.compacting_path)
+        records = _read_list(self.snapshot_path)
+        stats = self._snapshot_stats(records)
+        if not _merged(records, segment):
+            records.extend(segment)
+            for r in segment:
+                _add(stats, r)
+            dump_json(self.snapshot_path, records)
+            self._write_stats(stats, _file_sig(self.snapshot_path))
+        os.remove(self.compacting_path)
+        self._stats = None  # reload from the new stats file on next use
+
+    # --- reads ----------------------------------------------------------------------
+    def records(self):
+        """Every result, oldest first."""
+        with locked(self.snapshot_path):
+            records = _read_list(self.snapshot_path)
+            segment, _ = _read_lines(self.compacting_path)
+            if not _merged(records, segment):
+                records.extend(segment)
+            records.extend(_read_lines(self.log_path)[0])
+        return records
+
+    def _snapshot_stats(self, records=None):
+        # aggregates of the snapshot: from the stats file while it matches the
+        # snapshot, else rebuilt once from the snapshot
+        sig = _file_sig(self.snapshot_path)
+        try:
+            saved = read_json(self.stats_path, {})
+        except CorruptFileError:
+            saved = {}  # only a cache: rebuilt below
+        if saved.get("version") == STATS_VERSION and saved.get("snapshot") == sig:
+            return _stats_from_json(saved["stats"])
+        stats = {}
+        for r in (records if records is not None else _read_list(self.snapshot_path)):
+            _add(stats, r)
+        self._write_stats(stats, sig)
+        return stats
+
+    def _write_stats(self, stats, sig):
+        dump_json(self.stats_path, {"version": STATS_VERSION, "snapshot": sig,
+                                        "stats": _stats_to_json(stats)})
+
+    def _refresh(self):
+        sig = _file_sig(self.snapshot_path)
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if self._stats is None or sig != self._snapshot_sig or log_size < self._log_pos:
+            # first use, or the log was compacted (here or by another process)
+            self._stats = self._snapshot_stats()
+            self._snapshot_sig = sig
+            self._log_pos = 0
+            segment, _ = _read_lines(self.compacting_path)
+            if segment and not _merged(_read_list(self.snapshot_path), segment):
+                for r in segment:
+                    _add(self._stats, r)
+        new, self._log_pos = _read_lines(self.log_path, self._log_pos)
+        for r in new:
+            _add(self._stats, r)
+
+    def stats(self, quiz_id=None):
+        """
+        Aggregates for one quiz (None if it has no results), or a dict of all of
+        them: { quiz_id, quiz_title, attempts, mean, median, best, histogram }.
+        Only log lines written since the last call are read.
+        """
+        with locked(self.snapshot_path):
+            self._refresh()
+        if quiz_id is not None:
+            agg = self._stats.get(quiz_id)
+            return _summary(quiz_id, agg) if agg else None
+        return {qid: _summary(qid, agg) for qid, agg in self._stats.items()}
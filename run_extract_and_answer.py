@@ -1,15 +1,24 @@
 # run_extract_and_answer.py
 import os
 import re
-import pdfplumber
 from PIL import Image, ImageTk
 import tkinter as tk
 from tkinter import messagebox, filedialog
+import extract_cache
+from image_bundle import exists, open_image
+from image_store import store_image
+from pdf_session import open_session
+from spatial import assign_images
+from line_grouping import group_chars, LINE_TOLERANCE
+import page_triage
 
 PDF_PATH = "/mnt/data/1.pdf"   # path to your uploaded PDF
 TMP_IMG_DIR = os.path.join(os.getcwd(), "q_images")
 os.makedirs(TMP_IMG_DIR, exist_ok=True)
 
+EXTRACTOR_VERSION = 5  # bump when output changes, invalidates cached results
+RESOLUTION = 200       # DPI used when cropping images
+
 QUESTION_NUM_RE = re.compile(r'^\s*(\d+)\s*[\.\)]')  # matches lines starting with "1." or "1)" etc.
 
 # sensible list of substrings that indicate a bold font name in many PDFs
@@ -25,38 +34,13 @@ def is_font_bold(fontname: str) -> bool:
     return False
 
 
-def group_chars_to_lines(page):
+def group_chars_to_lines(page, y_tolerance=LINE_TOLERANCE):
     """
     Returns list of lines: each line is dict { 'text':..., 'chars': [char dicts], 'bbox': (x0,top,x1,bottom) }
     char dicts are pdfplumber char dicts with keys: text, x0, x1, top, bottom, fontname, size
+    Chars whose tops are within y_tolerance points of each other form one line (see line_grouping).
     """
-    chars = page.chars  # list of character dicts
-    if not chars:
-        return []
-
-    # Group by rounded top coordinate to form lines
-    lines_map = {}
-    for ch in chars:
-        top_key = int(round(ch["top"]))  # grouping
-        lines_map.setdefault(top_key, []).append(ch)
-
-    # Sort lines by vertical position (top ascending)
-    sorted_keys = sorted(lines_map.keys())
-    lines = []
-    for k in sorted_keys:
-        row_chars = sorted(lines_map[k], key=lambda c: c["x0"])  # left to right
-        text = "".join(c.get("text", "") for c in row_chars)
-        # compute bbox
-        x0 = min(c["x0"] for c in row_chars)
-        x1 = max(c["x1"] for c in row_chars)
-        top = min(c["top"] for c in row_chars)
-        bottom = max(c["bottom"] for c in row_chars)
-        lines.append({
-            "text": text,
-            "chars": row_chars,
-            "bbox": (x0, top, x1, bottom)
-        })
-    return lines
+    return group_chars(page.chars, y_tolerance)
 
 
 def merge_bboxes(bboxes):
@@ -74,18 +58,24 @@ def bbox_intersects(a, b):
     return not (ax1 < bx0 or ax0 > bx1 or ay1 < by0 or ay0 > by1)
 
 
-def find_question_blocks(pdf_path):
+def iter_question_blocks(pdf_path, triage=True, y_tolerance=LINE_TOLERANCE):
     """
-    Walks pages and returns a list of question dicts:
+    Walks pages and yields question dicts as soon as their page is done:
       { 'qnum': int or None, 'text': str, 'page': page_number (1-based), 'bbox': (x0,top,x1,bottom), 'images': [png_paths] }
     Prefers lines whose leading number characters appear to be in bold font.
+    With triage, only pages page_triage labels text-question are processed
+    (cover, instruction and answer-key pages are skipped).
+    y_tolerance: how far apart char tops may be within a line (group_chars_to_lines).
     """
-    questions = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for p_idx, page in enumerate(pdf.pages, start=1):
-            lines = group_chars_to_lines(page)
+    with open_session(pdf_path) as doc:
+        for p_idx in doc.page_numbers:
+            if triage and doc.label(p_idx) != page_triage.TEXT_QUESTION:
+                continue
+            lines = group_chars_to_lines(doc.page(p_idx), y_tolerance)
             if not lines:
                 continue
+            # rasterised at most once, crops are slices of that render
+            renderer = doc.renderer(p_idx)
 
             # detect candidate question-start lines and whether the number glyphs are bold
             starts = []
@@ -117,49 +107,60 @@ def find_question_blocks(pdf_path):
                 # fallback: if no starts on this page, skip
                 continue
 
-            # Build blocks from these indices
+            # Build blocks from these indices: each ends at the next used index or end of page
+            end_indices = use_indices[1:] + [len(lines)]
+            block_bboxes = [merge_bboxes([l["bbox"] for l in lines[s:e]])
+                            for s, e in zip(use_indices, end_indices)]
+            # pdfplumber image dict coords are x0, top, x1, bottom
+            img_bboxes = [(img.get("x0"), img.get("top"), img.get("x1"), img.get("bottom"))
+                          for img in doc.images(p_idx)]
+            # images intersecting each block_bbox, via a sweep over the page instead of blocks x images
+            block_hits = assign_images(block_bboxes, img_bboxes)
+
             for si_index, start_ln_idx in enumerate(use_indices):
                 start_line_idx = start_ln_idx
-                # end at next used index or end of page
-                if si_index + 1 < len(use_indices):
-                    end_line_idx = use_indices[si_index + 1]
-                else:
-                    end_line_idx = len(lines)
+                end_line_idx = end_indices[si_index]
                 # combine text lines from start_line_idx upto end_line_idx (exclusive)
                 block_lines = lines[start_line_idx:end_line_idx]
                 block_text = "\n".join(l["text"] for l in block_lines).strip()
-                block_bbox = merge_bboxes([l["bbox"] for l in block_lines])
-                # find images (page.images) intersecting block_bbox
+                block_bbox = block_bboxes[si_index]
                 imgs = []
-                for img_idx, img in enumerate(page.images or []):
-                    # pdfplumber image dict coords are x0, top, x1, bottom
-                    img_bbox = (img.get("x0"), img.get("top"), img.get("x1"), img.get("bottom"))
-                    if bbox_intersects(block_bbox, img_bbox):
-                        # crop the image region and save as PNG file
-                        try:
-                            cropped = page.within_bbox(img_bbox).to_image(resolution=200).original
-                            # Save to tmp folder
-                            img_name = f"p{p_idx}_q{si_index}_img{img_idx}.png"
-                            img_path = os.path.join(TMP_IMG_DIR, img_name)
-                            cropped.save(img_path, format="PNG")
-                            imgs.append(img_path)
-                        except Exception:
-                            # fallback attempt: render full page and crop using PIL by transforming bbox to px coordinates
-                            imgs.append(None)
+                for img_idx in block_hits[si_index]:
+                    img_bbox = img_bboxes[img_idx]
+                    # crop the image region and save as PNG file
+                    try:
+                        cropped = renderer.crop(img_bbox, RESOLUTION)
+                        # Save to the PDF's image bundle, by pixel hash (identical crops stored once)
+                        imgs.append(store_image(cropped, TMP_IMG_DIR, doc.path))
+                    except Exception:
+                        # fallback attempt: render full page and crop using PIL by transforming bbox to px coordinates
+                        imgs.append(None)
                 # determine qnum from first line
                 first_line_text = block_lines[0]["text"]
                 m = QUESTION_NUM_RE.match(first_line_text)
                 qnum = int(m.group(1)) if m else None
 
-                questions.append({
+                yield {
                     "qnum": qnum,
                     "text": block_text,
                     "page": p_idx,
                     "bbox": block_bbox,
                     "images": imgs
-                })
+                }
+
+
+def find_question_blocks(pdf_path, triage=True, y_tolerance=LINE_TOLERANCE):
+    """Same as iter_question_blocks, as a list."""
+    return list(iter_question_blocks(pdf_path, triage, y_tolerance))
 
-    return questions
+
+def find_question_blocks_cached(pdf_path, y_tolerance=LINE_TOLERANCE):
+    """Same as find_question_blocks, served from extract_cache when the PDF is unchanged."""
+    params = {"img_dir": TMP_IMG_DIR, "resolution": RESOLUTION, "question": QUESTION_NUM_RE.pattern,
+              "bold_hints": BOLD_HINTS, "line_tolerance": y_tolerance,
+              "triage": page_triage.TRIAGE_VERSION}
+    return extract_cache.cached(pdf_path, "run_extract_and_answer", EXTRACTOR_VERSION, params,
+                                lambda: find_question_blocks(pdf_path, y_tolerance=y_tolerance))
 
 
 # ---------------- GUI to show question + images and record A/B/C/D ----------------
@@ -237,12 +238,12 @@ class QuizApp:
             # find first valid image path
             img_path = None
             for ip in q["images"]:
-                if ip and os.path.exists(ip):
+                if ip and exists(ip):
                     img_path = ip
                     break
             if img_path:
                 try:
-                    im = Image.open(img_path)
+                    im = open_image(img_path)
                     im.thumbnail((900, 480), Image.LANCZOS)
                     self.current_img_tk = ImageTk.PhotoImage(im)
                     self.img_label.config(image=self.current_img_tk)
@@ -309,21 +310,31 @@ class QuizApp:
 # ---------------- main execution ----------------
 
 def main():
+    # one session for both passes: the fallback reuses the pages already parsed
+    with open_session(PDF_PATH) as doc:
+        questions = _load_questions(doc)
+    if questions is None:
+        return
+
+    # Build and launch GUI
+    root = tk.Tk()
+    app = QuizApp(root, questions)
+    root.mainloop()
+
+
+def _load_questions(doc):
     # Step 1: extract question blocks
     try:
-        questions = find_question_blocks(PDF_PATH)
+        questions = find_question_blocks_cached(PDF_PATH)
     except Exception as e:
         messagebox.showerror("Error", f"Failed to parse PDF: {e}")
-        return
+        return None
 
     if not questions:
         # fallback: try weaker detection (any numbered line)
         messagebox.showwarning("No bolded numbers found", "No bolded-number question starts were found. Attempting fallback extraction (any numbered line).")
         # fallback: do simple splitting by regex
-        with pdfplumber.open(PDF_PATH) as pdf:
-            full_text = []
-            for p in pdf.pages:
-                full_text.append(p.extract_text() or "")
+        full_text = [doc.text(n) for n in doc.page_numbers]
         all_text = "\n\n".join(full_text)
         # split by lines beginning with numbers
         parts = re.split(r'(?m)(?=^\s*\d+\s*\.)', all_text)
@@ -335,11 +346,7 @@ def main():
             m = re.match(r'^\s*(\d+)\s*\.\s*', part)
             qnum = int(m.group(1)) if m else i+1
             questions.append({"qnum": qnum, "text": part, "page": None, "bbox": None, "images": []})
-
-    # Build and launch GUI
-    root = tk.Tk()
-    app = QuizApp(root, questions)
-    root.mainloop()
+    return questions
 
 
 if __name__ == "__main__":
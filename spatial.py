@@ -0,0 +1,40 @@
+# spatial.py
+# Assign page images to question blocks without testing every (block, image) pair.
+
+
+def assign_images(block_bboxes, image_bboxes):
+    """
+    For each block bbox returns the indices (ascending) of the image bboxes that
+    intersect it. Boxes are (x0, top, x1, bottom); touching edges count as
+    intersecting, same as the extractors' intersects()/bbox_intersects().
+
+    Sweep line over the vertical axis: blocks are visited by top, images enter
+    the active set once their top is above the block's bottom and leave it for
+    good once their bottom is above the block's top. Only active images are
+    tested, so a page costs O((blocks + images) log images) plus the matches,
+    instead of O(blocks * images).
+    """
+    result = [[] for _ in block_bboxes]
+    if not block_bboxes or not image_bboxes:
+        return result
+
+    images = sorted(range(len(image_bboxes)), key=lambda i: image_bboxes[i][1])
+    blocks = sorted(range(len(block_bboxes)), key=lambda b: block_bboxes[b][1])
+
+    active = []
+    nxt = 0
+    for b in blocks:
+        bx0, btop, bx1, bbottom = block_bboxes[b]
+        while nxt < len(images) and image_bboxes[images[nxt]][1] <= bbottom:
+            active.append(images[nxt])
+            nxt += 1
+        # block tops only grow, so an image ending above this block is done
+        active = [i for i in active if image_bboxes[i][3] >= btop]
+        # blocks may overlap vertically (two-column pages), so an earlier,
+        # taller block can have pulled in images below this one's bottom
+        hits = [i for i in active
+                if image_bboxes[i][1] <= bbottom
+                and not (bx1 < image_bboxes[i][0] or bx0 > image_bboxes[i][2])]
+        hits.sort()
+        result[b] = hits
+    return result
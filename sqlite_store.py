@@ -0,0 +1,174 @@
+# sqlite_store.py
+# Quiz bank in an indexed SQLite database (stdlib sqlite3, WAL mode). One row per
+# quiz and one per question, so saving or editing touches only the rows that
+# changed instead of rewriting the whole bank like quizzes.json.
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS quizzes (
+    seq            INTEGER PRIMARY KEY AUTOINCREMENT,  -- insertion order, kept on update
+    id             TEXT NOT NULL UNIQUE,
+    title          TEXT,
+    source         TEXT,
+    question_count INTEGER NOT NULL DEFAULT 0,
+    fields         TEXT NOT NULL                       -- JSON of every key but id/questions
+);
+CREATE TABLE IF NOT EXISTS questions (
+    quiz_id  TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id       TEXT,
+    body     TEXT NOT NULL,                            -- the question dict as JSON
+    PRIMARY KEY (quiz_id, position)
+);
+CREATE INDEX IF NOT EXISTS questions_by_id ON questions (quiz_id, id);
+"""
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class SqliteQuizStore:
+    """
+    Quiz store backed by SQLite. Quizzes are dicts as in quizzes.json:
+      { id, title, source, ..., questions: [ {id, text, options, ...} ] }
+    Methods are safe to call from several threads; WAL lets other processes
+    read while one writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, fn, *args):
+        # one transaction per call
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    # --- writes -------------------------------------------------------------------
+    def _save_quiz(self, quiz: Dict):
+        questions = quiz.get("questions") or []
+        fields = {k: v for k, v in quiz.items() if k not in ("id", "questions")}
+        self._conn.execute(
+            "INSERT INTO quizzes (id, title, source, question_count, fields) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET title = excluded.title, source = excluded.source, "
+            "question_count = excluded.question_count, fields = excluded.fields",
+            (quiz.get("id"), quiz.get("title"), quiz.get("source"), len(questions), _dumps(fields)))
+        self._conn.execute("DELETE FROM questions WHERE quiz_id = ?", (quiz.get("id"),))
+        self._conn.executemany(
+            "INSERT INTO questions (quiz_id, position, id, body) VALUES (?, ?, ?, ?)",
+            ((quiz.get("id"), i, q.get("id"), _dumps(q)) for i, q in enumerate(questions)))
+
+    def save_quiz(self, quiz: Dict):
+        """Inserts the quiz, or replaces the one with the same id (keeping its place)."""
+        self._write(self._save_quiz, quiz)
+
+    def _update_question(self, quiz_id: str, question: Dict) -> bool:
+        cur = self._conn.execute("UPDATE questions SET body = ? WHERE quiz_id = ? AND id = ?",
+                                 (_dumps(question), quiz_id, question.get("id")))
+        if cur.rowcount:
+            return True
+        row = self._conn.execute("SELECT question_count FROM quizzes WHERE id = ?", (quiz_id,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("INSERT INTO questions (quiz_id, position, id, body) VALUES (?, ?, ?, ?)",
+                           (quiz_id, row[0], question.get("id"), _dumps(question)))
+        self._conn.execute("UPDATE quizzes SET question_count = question_count + 1 WHERE id = ?", (quiz_id,))
+        return True
+
+    def update_question(self, quiz_id: str, question: Dict) -> bool:
+        """
+        Replaces the question with the same id in the quiz, or appends it.
+        Returns False if there is no such quiz.
+        """
+        return self._write(self._update_question, quiz_id, question)
+
+    def delete_quiz(self, quiz_id: str):
+        def delete():
+            self._conn.execute("DELETE FROM questions WHERE quiz_id = ?", (quiz_id,))
+            self._conn.execute("DELETE FROM quizzes WHERE id = ?", (quiz_id,))
+        self._write(delete)
+
+    # --- reads --------------------------------------------------------------------
+    def _questions(self, quiz_id):
+        rows = self._conn.execute("SELECT body FROM questions WHERE quiz_id = ? ORDER BY position", (quiz_id,))
+        return [json.loads(body) for (body,) in rows]
+
+    def _quiz(self, quiz_id, fields):
+        return {"id": quiz_id, **json.loads(fields), "questions": self._questions(quiz_id)}
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT fields FROM quizzes WHERE id = ?", (quiz_id,)).fetchone()
+            return self._quiz(quiz_id, row[0]) if row else None
+
+    def load_quizzes(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id, fields FROM quizzes ORDER BY seq").fetchall()
+            return [self._quiz(quiz_id, fields) for quiz_id, fields in rows]
+
+    def list_quizzes(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """One page of { id, title, source, question_count }, without question bodies."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, source, question_count FROM quizzes ORDER BY seq LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)).fetchall()
+        return [{"id": i, "title": t, "source": s, "question_count": n} for i, t, s, n in rows]
+
+    def count_quizzes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quizzes").fetchone()[0]
+
+    # --- import -------------------------------------------------------------------
+    def import_json(self, paths: Iterable[str], force: bool = False) -> int:
+        """
+        Copies quizzes from quizzes.json-style files into the database, once per
+        file (tracked in meta), unless force. Returns the number of quizzes imported.
+        """
+        count = 0
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            marker = "imported:" + os.path.abspath(path)
+            with self._lock:
+                done = self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone()
+            if done and not force:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                quizzes = json.load(f)
+
+            def import_all():
+                for quiz in quizzes:
+                    self._save_quiz(quiz)
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (marker, str(len(quizzes))))
+            self._write(import_all)  # all or nothing
+            count += len(quizzes)
+        return count
@@ -0,0 +1,37 @@
+# tests/test_answer_journal.py
+# AnswerJournal recovery after a crash: answers written before and after a line
+# torn by the crash all come back from replay().
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_journal import AnswerJournal, journal_path
+
+
+def test_recovery_after_torn_write(tmp_path):
+    path = journal_path("ab" * 32, str(tmp_path))
+    journal = AnswerJournal(path, flush_interval=0)
+    journal.record(1, "A")
+    journal.record(2, "B")
+    journal.flush()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('[3, "D')  # the process died mid-write
+
+    # the next session answers before the journal is replayed (the PDF is still loading)
+    journal = AnswerJournal(path, flush_interval=0)
+    journal.record(4, "A")
+    journal.record(2, "C")
+    journal.close()
+
+    assert AnswerJournal(path).replay() == {1: "A", 2: "C", 4: "A"}
+    assert AnswerJournal(path).replay() == {1: "A", 2: "C", 4: "A"}  # compacted file reads the same
+
+
+def test_journals_of_other_pdfs_are_separate(tmp_path):
+    first = AnswerJournal(journal_path("11" * 32, str(tmp_path)))
+    first.record(1, "A")
+    first.close()
+    assert AnswerJournal(journal_path("22" * 32, str(tmp_path))).replay() == {}
+    assert AnswerJournal(journal_path("11" * 32, str(tmp_path))).replay() == {1: "A"}
@@ -0,0 +1,91 @@
+# tests/test_page_triage.py
+# page_triage labels for page shapes that were mislabelled: ratio and power-of-ten
+# options, numeric-answer sections, and question numbers followed by a digit.
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_triage
+from page_triage import ANSWER_KEY, FIGURE_ONLY, SKIP, TEXT_QUESTION, classify_page, page_signals
+
+CHAR_WIDTH = 5
+LINE_HEIGHT = 12
+
+
+class FakePage:
+    """The part of a pdfplumber page page_signals reads: chars laid out one line per row."""
+
+    width, height = 595, 842
+
+    def __init__(self, lines, images=()):
+        self.chars = []
+        for row, line in enumerate(lines):
+            top = 50 + row * LINE_HEIGHT
+            for col, ch in enumerate(line):
+                if not ch.isspace():
+                    x0 = 40 + col * CHAR_WIDTH
+                    self.chars.append({"text": ch, "top": top, "x0": x0, "x1": x0 + CHAR_WIDTH - 1})
+        self.images = list(images)
+
+
+RATIO_PAGE = [
+    "1. The ratio of the radii of two nuclei is",
+    "(1) 1:2 (2) 2:1 (3) 1:4 (4) 4:1",
+    "2. Two bodies have kinetic energies in the ratio",
+    "(1) 1:3 (2) 3:1 (3) 2:3 (4) 3:2",
+    "3. The ratio of their momenta is",
+    "(1) 1:√3 (2) √3:1 (3) 1:9 (4) 9:1",
+]
+POWER_PAGE = [
+    "4. The charge on an electron is of the order of",
+    "(1) 10-19 C (2) 10-16 C (3) 10-3 C (4) 10-6 C",
+    "5. The wavelength of X-rays is of the order of",
+    "(1) 10-10 m (2) 10-3 m (3) 10-6 m (4) 10-2 m",
+]
+NUMERIC_PAGE = [
+    "SECTION B (Numerical). Instructions: enter the answer as an integer.",
+    "12. 2 kg block slides down a rough incline. Find the work done by friction.",
+    "13. 5 moles of an ideal gas expand isothermally. Find the work done.",
+]
+KEY_PAGE = ["Answer Key", "1. (2) 2. (1) 3. (3) 4. (4) 5. (1) 6. (2)", "7-A 8-B 9-C 10-D"]
+
+
+def test_ratio_options_are_questions():
+    s = page_signals(FakePage(RATIO_PAGE))
+    assert s["key_hits"] == 0 and s["question_hits"] == 3
+    assert classify_page(FakePage(RATIO_PAGE)) == TEXT_QUESTION
+
+
+def test_power_of_ten_options_are_questions():
+    assert page_signals(FakePage(POWER_PAGE))["key_hits"] == 0
+    assert classify_page(FakePage(POWER_PAGE)) == TEXT_QUESTION
+
+
+def test_numeric_section_with_instructions_is_questions():
+    assert page_signals(FakePage(NUMERIC_PAGE))["question_hits"] == 2
+    assert classify_page(FakePage(NUMERIC_PAGE)) == TEXT_QUESTION
+
+
+def test_question_number_before_a_digit_counts_but_decimals_do_not():
+    assert len(page_triage.QUESTION_RE.findall("12. 2 kg block")) == 1
+    assert len(page_triage.QUESTION_RE.findall("a mass of 2.5 kg")) == 0
+
+
+def test_option_continuation_page_is_questions():
+    page = FakePage(["(3) the speed doubles", "(4) the speed is unchanged"])
+    assert classify_page(page) == TEXT_QUESTION
+
+
+def test_answer_key_page():
+    assert classify_page(FakePage(KEY_PAGE)) == ANSWER_KEY
+    assert classify_page(FakePage(KEY_PAGE[1:])) == ANSWER_KEY  # no heading, but entries outnumber questions
+
+
+def test_cover_and_blank_pages():
+    cover = FakePage(["PHYSICS MOCK TEST 3", "Read all instructions before you begin"])
+    assert classify_page(cover) == SKIP
+    image = {"x0": 100, "x1": 200, "top": 100, "bottom": 200}
+    assert classify_page(FakePage(["Figure for the next questions"], images=[image])) == FIGURE_ONLY
+    assert classify_page(FakePage([])) == SKIP
@@ -0,0 +1,69 @@
+# tests/test_parser.py
+# Answer-key detection in parser: option values that look like key entries
+# ("(1) 1:2", "10-3 N") must not end the questions, and a real key must still apply.
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parser import count_key_entries, parse_pages, parse_questions_from_text, scan_answer_key
+
+RATIO_PAGES = [
+    "PHYSICS\n1. The ratio of the radii of two nuclei is\n(1) 1:2 (2) 2:1 (3) 1:4 (4) 4:1\n"
+    "2. Two bodies have kinetic energies in the ratio\n(1) 1:3 (2) 3:1 (3) 2:3 (4) 3:2\n",
+    "3. The ratio of their momenta is\n(1) 1:√3 (2) √3:1 (3) 1:9 (4) 9:1\n"
+    "4. Two wires have resistances in the ratio\n(1) 1:2 (2) 2:1 (3) 4:1 (4) 1:4\n",
+    "5. The charge on an electron is of the order of\n(1) 10-19 C (2) 10-16 C (3) 10-3 C (4) 10-6 C\n",
+    "6. The wavelength of X-rays is of the order of\n(1) 10-10 m (2) 10-3 m (3) 10-6 m (4) 10-2 m\n",
+]
+KEY = "1. (2) 2. (1) 3. (3) 4. (4) 5. (1) 6. (2)\n"
+EXPECTED = [1, 0, 2, 3, 0, 1]
+
+
+def _numbers(questions):
+    return [q["number"] for q in questions]
+
+
+def _answers(questions):
+    return [q["correctIndex"] for q in questions]
+
+
+def test_option_values_are_not_key_entries():
+    for page in RATIO_PAGES:
+        assert count_key_entries(page) == 0
+    assert scan_answer_key("1-2 2-1 3:(3) 4: C 5. (1)") == {1: "2", 2: "1", 3: "3", 4: "C", 5: "1"}
+
+
+def test_ratio_pages_parse_like_joined_text():
+    paged = parse_pages(RATIO_PAGES)
+    joined = parse_questions_from_text("\n\n".join(RATIO_PAGES))
+    assert _numbers(paged) == _numbers(joined) == [1, 2, 3, 4, 5, 6]
+    assert [q["options"] for q in paged] == [q["options"] for q in joined]
+    assert paged[4]["options"] == ["10-19 C", "10-16 C", "10-3 C", "10-6 C"]
+
+
+def test_headed_key_applies():
+    questions = parse_pages(RATIO_PAGES + ["Answer Key\n" + KEY])
+    assert _numbers(questions) == [1, 2, 3, 4, 5, 6]
+    assert _answers(questions) == EXPECTED
+
+
+def test_key_without_heading_at_the_end_applies():
+    assert _answers(parse_pages(RATIO_PAGES + [KEY])) == EXPECTED
+
+
+def test_key_split_over_pages_applies():
+    pages = RATIO_PAGES + ["ANSWERS\n1-2 2-1 3-3\n", "4-4 5-1 6-2\n"]
+    assert _answers(parse_pages(pages)) == EXPECTED
+
+
+def test_key_like_page_followed_by_questions_is_parsed():
+    pages = RATIO_PAGES[:2] + [KEY.replace(". (", "-")] + RATIO_PAGES[2:]
+    assert _numbers(parse_pages(pages))[-2:] == [5, 6]
+
+
+def test_answers_word_inside_a_question_is_not_a_heading():
+    pages = ["1. Which of the following answers is correct?\n(1) a (2) b (3) c (4) d\n",
+             "Answers\n2. Next question\n(1) w (2) x (3) y (4) z\n"]
+    assert _numbers(parse_pages(pages)) == [1, 2]
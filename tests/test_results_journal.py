@@ -0,0 +1,86 @@
+# tests/test_results_journal.py
+# ResultsJournal recovery: appends torn by a crash, a crash in the middle of a
+# compaction, and per-quiz stats across compactions.
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import results_journal
+from results_journal import ResultsJournal
+
+
+def _result(quiz_id, score):
+    return {"quiz_id": quiz_id, "quiz_title": quiz_id.upper(), "score": score, "total": 10}
+
+
+def _journal(tmp_path, **kwargs):
+    return ResultsJournal(str(tmp_path / "results.json"), **kwargs)
+
+
+def test_append_after_torn_line(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append(_result("a", 3))
+    with open(journal.log_path, "a", encoding="utf-8") as f:
+        f.write('{"quiz_id": "a", "sc')  # the process died mid-write
+    journal.append(_result("a", 5))
+    journal.append(_result("b", 7))
+
+    fresh = _journal(tmp_path)
+    assert [r["score"] for r in fresh.records()] == [3, 5, 7]
+    assert fresh.stats("a")["attempts"] == 2
+    fresh.compact()
+    assert [r["score"] for r in _journal(tmp_path).records()] == [3, 5, 7]
+
+
+def test_crash_before_removing_compacting_segment(tmp_path, monkeypatch):
+    journal = _journal(tmp_path)
+    for score in (1, 2, 3):
+        journal.append(_result("a", score))
+    real_remove = os.remove
+
+    def crash(path):
+        if path == journal.compacting_path:
+            raise OSError("crashed")
+        real_remove(path)
+
+    monkeypatch.setattr(results_journal.os, "remove", crash)
+    try:
+        journal.compact()  # snapshot written, segment left behind
+    except OSError:
+        pass
+    monkeypatch.setattr(results_journal.os, "remove", real_remove)
+    assert os.path.exists(journal.compacting_path)
+
+    fresh = _journal(tmp_path)
+    assert [r["score"] for r in fresh.records()] == [1, 2, 3]
+    assert fresh.stats("a")["attempts"] == 3
+    fresh.append(_result("a", 4))
+    fresh.compact()  # finishes the old segment without merging it twice
+    assert not os.path.exists(journal.compacting_path)
+    assert [r["score"] for r in _journal(tmp_path).records()] == [1, 2, 3, 4]
+    assert _journal(tmp_path).stats("a")["attempts"] == 4
+
+
+def test_stats_across_compactions(tmp_path):
+    journal = _journal(tmp_path, compact_log_bytes=200)  # compacts every few appends
+    scores = {"a": [], "b": []}
+    for i in range(40):
+        quiz_id = "ab"[i % 2]
+        score = (i * 7) % 11
+        scores[quiz_id].append(score)
+        journal.append(_result(quiz_id, score))
+        if i % 5 == 0:
+            journal.stats()  # read between compactions, from the log tail
+    assert len(results_journal._read_list(journal.snapshot_path)) > 30  # most went through compaction
+
+    for reader in (journal, _journal(tmp_path)):
+        for quiz_id, values in scores.items():
+            s = reader.stats(quiz_id)
+            ordered = sorted(values)
+            assert s["attempts"] == len(values)
+            assert s["mean"] == sum(values) / len(values)
+            assert s["median"] == (ordered[(len(values) - 1) // 2] + ordered[len(values) // 2]) / 2
+            assert s["best"] == max(values)
+    assert len(journal.records()) == 40
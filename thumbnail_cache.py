@@ -0,0 +1,116 @@
+# thumbnail_cache.py
+# Decoded, downscaled question images for the viewer. Thumbnails are kept in an
+# LRU bounded by their pixel bytes, keyed by (image ref, size), and can be
+# prepared ahead of time on background threads (prefetch), so turning to the
+# next or previous question doesn't wait on PNG decoding. Each prefetch()
+# replaces the last one: queued jobs for images no longer near the current
+# question are cancelled, and at most PREFETCH_LIMIT jobs are pending. Only PIL
+# images are made here: Tk's PhotoImage must still be built on the Tk thread.
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+CACHE_BYTES = 64 * 1024 * 1024  # decoded pixels kept
+PREFETCH_WORKERS = 2
+PREFETCH_LIMIT = 16  # prefetch jobs queued or running at once
+
+
+def _open(ref):
+    return Image.open(ref)
+
+
+def _nbytes(im):
+    return im.size[0] * im.size[1] * len(im.getbands())
+
+
+class ThumbnailCache:
+    """
+    get(ref, size) returns the thumbnail (a PIL image no larger than size), or
+    None if the image can't be read. loader(ref) opens an image; by default
+    ref is a file path.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES, loader=_open, workers=PREFETCH_WORKERS,
+                 prefetch_limit=PREFETCH_LIMIT):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.prefetch_limit = prefetch_limit
+        self._cache = OrderedDict()  # (ref, size) -> image, least recently used first
+        self._used = 0
+        self._inflight = {}          # (ref, size) -> Future of a prefetch
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+
+    def _decode(self, ref, size):
+        try:
+            im = self.loader(ref)
+            im.thumbnail(size)  # decodes, downscaled
+            return im
+        except Exception:
+            return None
+
+    def _put(self, key, im):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if im is None or key in self._cache:
+                return
+            self._cache[key] = im
+            self._used += _nbytes(im)
+            while self._used > self.max_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self._used -= _nbytes(old)
+
+    def get(self, ref, size):
+        key = (ref, tuple(size))
+        with self._lock:
+            im = self._cache.get(key)
+            if im is not None:
+                self._cache.move_to_end(key)
+                return im
+            pending = self._inflight.get(key)
+            if pending is not None and pending.cancel():
+                # still queued behind other prefetches: decode it here, now
+                del self._inflight[key]
+                pending = None
+        if pending is not None:
+            return pending.result()  # already decoding: sooner than starting over
+        im = self._decode(ref, key[1])
+        self._put(key, im)
+        return im
+
+    def _prefetch_one(self, key):
+        im = self._decode(*key)
+        self._put(key, im)
+        return im
+
+    def prefetch(self, refs, size):
+        """
+        Decodes refs in the background, in the order given (nearest first),
+        skipping cached ones. Queued jobs of earlier calls for images not in refs
+        are dropped, and refs past prefetch_limit pending jobs are left out.
+        """
+        size = tuple(size)
+        wanted = {(ref, size) for ref in refs}
+        with self._lock:
+            self._cancel(lambda key: key not in wanted)
+            for ref in refs:
+                key = (ref, size)
+                if key in self._cache or key in self._inflight:
+                    continue
+                if len(self._inflight) >= self.prefetch_limit:
+                    break
+                self._inflight[key] = self._pool.submit(self._prefetch_one, key)
+
+    def _cancel(self, stale):
+        # drops the queued jobs whose key is stale; running ones finish (caller holds _lock)
+        for key, future in list(self._inflight.items()):
+            if stale(key) and future.cancel():
+                del self._inflight[key]
+
+    def clear(self):
+        with self._lock:
+            self._cancel(lambda key: True)
+            self._cache.clear()
+            self._used = 0